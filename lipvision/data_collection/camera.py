@@ -0,0 +1,91 @@
+"""
+Abertura e configuração da câmera compartilhadas pelos detectores
+"""
+
+import queue
+import threading
+import cv2
+from .config import get_config
+
+# Tamanho padrão da fila de leitura (back-pressure para limitar a RAM)
+READ_QUEUE_SIZE = 2
+
+
+def open_camera(camera_config=None):
+    """
+    Abre a câmera aplicando as configurações de captura.
+
+    Usa MJPG (compressão feita na própria webcam, menos banda USB) e um buffer
+    de apenas 1 frame no driver, para sempre entregar o frame mais recente.
+
+    Args:
+        camera_config (dict): Configuração da câmera (padrão: CAMERA_CONFIG)
+
+    Returns:
+        cv2.VideoCapture: Captura aberta (verificar com isOpened())
+    """
+    if camera_config is None:
+        camera_config = get_config('camera')
+
+    cap = cv2.VideoCapture(camera_config['camera_index'])
+    if not cap.isOpened():
+        return cap
+
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, camera_config['width'])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, camera_config['height'])
+    cap.set(cv2.CAP_PROP_FPS, camera_config['fps'])
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+class FrameReader:
+    """
+    Lê frames da câmera em uma thread separada, sobrepondo a captura ao processamento.
+
+    A fila é limitada: grab() sempre consome o frame do driver, mas a
+    decodificação (retrieve) só acontece quando há espaço na fila, então
+    frames que seriam descartados não são decodificados.
+    """
+
+    def __init__(self, cap, queue_size=READ_QUEUE_SIZE):
+        self.cap = cap
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._thread.start()
+
+    def _read_loop(self):
+        # O sinal de fim (None) é enviado mesmo se grab/retrieve lançar uma exceção,
+        # para que read() nunca fique bloqueado esperando uma thread que já terminou
+        try:
+            while not self._stop_event.is_set():
+                if not self.cap.grab():
+                    break
+                if self._queue.full():
+                    continue
+                ret, frame = self.cap.retrieve()
+                if not ret:
+                    break
+                self._put(frame)
+        finally:
+            self._put(None)
+
+    def _put(self, frame):
+        # Bloqueia enquanto a fila estiver cheia (apenas o sinal de fim pode
+        # chegar aqui com a fila cheia), mas continua verificando o sinal de parada
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(frame, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def read(self):
+        """Retorna o próximo frame (o frame pertence a quem o leu) ou None se a câmera falhar"""
+        return self._queue.get()
+
+    def stop(self):
+        """Encerra a thread de leitura (a captura continua aberta)"""
+        self._stop_event.set()
+        self._thread.join()
@@ -10,8 +10,9 @@ MEDIAPIPE_CONFIG = {
     # Número máximo de faces a detectar
     'max_num_faces': 1,
     
-    # Refinar landmarks (mais preciso, mas mais lento)
-    'refine_landmarks': True,
+    # Refinar landmarks com o modelo de atenção (íris e lábios; mais preciso, mas mais lento).
+    # Todos os índices de lábios usados estão no conjunto base de 468 pontos.
+    'refine_landmarks': False,
     
     # Confiança mínima para detecção
     'min_detection_confidence': 0.5,
@@ -21,6 +22,15 @@ MEDIAPIPE_CONFIG = {
     
     # Margem ao redor dos lábios (em pixels)
     'lip_margin': 20,
+    
+    # Distância mínima (em pixels) entre os landmarks centrais dos lábios para considerar a boca aberta
+    'mouth_open_distance': 3,
+    
+    # Caminho para um face_landmark.tflite quantizado (INT8); None usa o FaceMesh padrão
+    'quantized_model_path': None,
+    
+    # Caminho para um engine TensorRT FP16 do modelo de landmarks (usado apenas com GPU CUDA)
+    'trt_engine_path': None,
 }
 
 # Configurações do detector simples
@@ -31,6 +41,10 @@ SIMPLE_CONFIG = {
     # Número mínimo de vizinhos para validar detecção
     'min_neighbors': 5,
     
+    # Escala da imagem em que o cascade roda (a face só precisa do bounding box,
+    # que é reescalado para o frame original); 1.0 = resolução original
+    'detection_scale': 0.5,
+    
     # Região da boca (proporção da face)
     'mouth_region': {
         'y_start_ratio': 0.6,  # Começar a 60% da altura da face
@@ -41,6 +55,19 @@ SIMPLE_CONFIG = {
     
     # Margem ao redor da boca
     'mouth_margin': 10,
+    
+    # Boca aberta quando a altura da região da boca passa desta fração da largura
+    'mouth_open_ratio': 0.20,
+    
+    # Rodar o Haar cascade apenas a cada N frames; nos demais a face é
+    # rastreada (MOSSE, opencv-contrib); sem o opencv-contrib detecta em todos os frames
+    'detect_every': 5,  # 1 = detectar em todos os frames
+    
+    # Cascade de face: 'haar' (incluso no opencv-python) ou 'lbp' (features
+    # inteiras, bem mais rápido). O XML LBP não vem no pacote pip: baixar
+    # lbpcascade_frontalface_improved.xml de opencv/data/lbpcascades
+    'detector_backend': 'haar',
+    'lbp_cascade_path': 'lbpcascade_frontalface_improved.xml',
 }
 
 # Configurações da câmera
@@ -77,6 +104,9 @@ DISPLAY_CONFIG = {
     
     # Tamanho da janela de visualização do recorte
     'crop_preview_size': (200, 100),
+    
+    # Desenhar os pontos individuais dos landmarks (além dos contornos)
+    'draw_landmark_points': True,
 }
 
 # Configurações de salvamento
@@ -103,7 +133,16 @@ PERFORMANCE_CONFIG = {
     # Processar apenas a cada N frames (para economizar recursos)
     'frame_skip': 1,  # 1 = processar todos os frames
     
-    # Redimensionar frame antes do processamento
+    # Com frame_skip > 1: diferença média (níveis de cinza) na região da boca
+    # que força rodar o Face Mesh antes do próximo frame agendado (0 = desativado)
+    'motion_redetect_threshold': 12,
+    
+    # Threads internas do OpenCV (None = núcleos - 2, deixando dois núcleos
+    # livres para o grafo do MediaPipe e evitando disputa entre os dois pools)
+    'opencv_threads': None,
+    
+    # Redimensionar frame antes da inferência do Face Mesh (recorte e desenhos
+    # continuam na resolução original; faces pequenas podem deixar de ser detectadas)
     'resize_for_processing': {
         'enabled': False,
         'scale': 0.5,  # 50% do tamanho original
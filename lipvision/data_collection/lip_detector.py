@@ -2,10 +2,110 @@ import cv2
 import numpy as np
 import mediapipe as mp
 import os
-from datetime import datetime
+import atexit
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from .config import get_config
+from .overlay import TextOverlay
+from .camera import open_camera, FrameReader
+from .quantized_face_mesh import QuantizedFaceMesh
+from .trt_face_mesh import TRTFaceMesh, has_cuda_device
+
+# Tamanho máximo das filas do pipeline da câmera (back-pressure para limitar a RAM)
+PIPELINE_QUEUE_SIZE = 2
+# Máximo de recortes aguardando gravação em disco
+MAX_PENDING_SAVES = 32
+# Miniatura (largura, altura) usada para detectar movimento entre execuções do Face Mesh
+MOTION_THUMB_SIZE = (80, 60)
+
+# Threads do OpenCV limitadas para não disputar núcleos com o grafo do MediaPipe
+_opencv_threads = get_config('performance')['opencv_threads']
+cv2.setUseOptimized(True)
+cv2.setNumThreads(_opencv_threads if _opencv_threads is not None else max(1, (os.cpu_count() or 1) - 2))
+
+# Instâncias de FaceMesh compartilhadas entre detectores, por configuração,
+# com contagem de referências (o grafo é liberado quando o último detector fecha)
+_FACE_MESHES = {}
+_FACE_MESH_REFS = {}
+_FACE_MESH_LOCK = threading.Lock()
+
+class _SharedFaceMesh:
+    """
+    FaceMesh compartilhado com process() serializado por um lock do grafo.
+    
+    O grafo está em modo vídeo (static_image_mode=False), então o estado de
+    rastreamento também é compartilhado: detectores alimentados por fluxos
+    diferentes ao mesmo tempo fazem o MediaPipe perder o rastreamento e
+    detectar a face de novo (resultados corretos, porém mais lentos).
+    """
+
+    def __init__(self, face_mesh):
+        self._face_mesh = face_mesh
+        self._lock = threading.Lock()
+
+    def process(self, image):
+        with self._lock:
+            return self._face_mesh.process(image)
+
+    def close(self):
+        with self._lock:
+            self._face_mesh.close()
+
+def _acquire_face_mesh(max_num_faces, refine_landmarks, min_detection_confidence, min_tracking_confidence):
+    """Retorna a chave e o FaceMesh compartilhado para a configuração (carrega o grafo apenas uma vez)"""
+    key = (max_num_faces, refine_landmarks, min_detection_confidence, min_tracking_confidence)
+    with _FACE_MESH_LOCK:
+        if key not in _FACE_MESHES:
+            _FACE_MESHES[key] = _SharedFaceMesh(mp.solutions.face_mesh.FaceMesh(
+                max_num_faces=max_num_faces,
+                refine_landmarks=refine_landmarks,
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence
+            ))
+            _FACE_MESH_REFS[key] = 0
+        _FACE_MESH_REFS[key] += 1
+        return key, _FACE_MESHES[key]
+
+def _release_face_mesh(key):
+    """Libera uma referência ao FaceMesh compartilhado e fecha o grafo na última"""
+    with _FACE_MESH_LOCK:
+        if key not in _FACE_MESHES:
+            return
+        _FACE_MESH_REFS[key] -= 1
+        if _FACE_MESH_REFS[key] <= 0:
+            _FACE_MESHES.pop(key).close()
+            del _FACE_MESH_REFS[key]
+
+@atexit.register
+def _close_face_meshes():
+    """Libera os grafos do MediaPipe ao encerrar o processo"""
+    with _FACE_MESH_LOCK:
+        for face_mesh in _FACE_MESHES.values():
+            face_mesh.close()
+        _FACE_MESHES.clear()
+        _FACE_MESH_REFS.clear()
 
 class LipDetector:
+    # Índices dos pontos dos lábios no MediaPipe Face Mesh
+    # Contorno externo completo dos lábios (o 308 final volta à comissura: faz parte do contorno desenhado)
+    LIPS_OUTER = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 308, 324, 318, 402, 317, 14, 87, 178, 88, 95, 78, 191, 80, 81, 82, 13, 312, 311, 310, 415, 308]
+    # Lábio superior (apenas)
+    UPPER_LIP = [61, 185, 40, 39, 37, 0, 267, 269, 270, 409, 291]
+    # Lábio inferior (apenas)
+    LOWER_LIP = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291]
+    # Todos os pontos usados, sem repetição (cada landmark é lido uma única vez)
+    LIP_INDICES = list(dict.fromkeys(LIPS_OUTER + UPPER_LIP + LOWER_LIP))
+    # Posições de cada região dentro de LIP_INDICES (gather vetorizado)
+    LIPS_OUTER_POS = np.array(list(map(LIP_INDICES.index, LIPS_OUTER)), dtype=np.intp)
+    UPPER_LIP_POS = np.array(list(map(LIP_INDICES.index, UPPER_LIP)), dtype=np.intp)
+    LOWER_LIP_POS = np.array(list(map(LIP_INDICES.index, LOWER_LIP)), dtype=np.intp)
+    # Pontos centrais dos lábios superior (13) e inferior (14), usados para medir a abertura da boca
+    MOUTH_UPPER_POS = LIP_INDICES.index(13)
+    MOUTH_LOWER_POS = LIP_INDICES.index(14)
+    
     def __init__(self):
         """Inicializa o detector de lábios usando MediaPipe"""
         self.mp_face_mesh = mp.solutions.face_mesh
@@ -15,159 +115,371 @@ class LipDetector:
         # Carregar configurações
         self.mediapipe_config = get_config('mediapipe')
         self.save_config = get_config('save')
+        self.display_config = get_config('display')
+        self.camera_config = get_config('camera')
+        self.performance_config = get_config('performance')
+        
+        # Margem do recorte dos lábios (2x a margem configurada)
+        self._lip_margin = int(self.mediapipe_config['lip_margin'] * 2)
+        self._mouth_open_distance = self.mediapipe_config['mouth_open_distance']
         
-        # Configuração do Face Mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
+        # Desenhar os pontos individuais dos lábios (além dos contornos)
+        self._draw_landmark_points = self.display_config['draw_landmark_points']
+        
+        # Rodar o Face Mesh apenas a cada N frames, reutilizando os últimos landmarks nos demais
+        self._frame_skip = max(1, self.performance_config['frame_skip'])
+        self._tick = 0
+        # multi_face_landmarks usados no último process_frame (None sem face)
+        self.last_landmarks = None
+        
+        # Movimento grande na região da boca (miniatura em cinza) força nova detecção
+        self._motion_threshold = self.performance_config['motion_redetect_threshold']
+        self._motion_ref = None
+        self._motion_cur = np.empty(MOTION_THUMB_SIZE[::-1], dtype=np.uint8)
+        self._motion_thumb = np.empty(MOTION_THUMB_SIZE[::-1] + (3,), dtype=np.uint8)
+        self._motion_roi = None
+        
+        # Abertura da boca (pixels) da face recortada no último process_frame, ou None
+        self.mouth_distance = None
+        
+        # Configuração do Face Mesh (instância compartilhada entre detectores)
+        self._face_mesh_key, self.face_mesh = _acquire_face_mesh(
             max_num_faces=self.mediapipe_config['max_num_faces'],
             refine_landmarks=self.mediapipe_config['refine_landmarks'],
             min_detection_confidence=self.mediapipe_config['min_detection_confidence'],
             min_tracking_confidence=self.mediapipe_config['min_tracking_confidence']
         )
         
-        # Índices dos pontos dos lábios no MediaPipe Face Mesh
-        # Contorno externo completo dos lábios
-        self.LIPS_OUTER = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 308, 324, 318, 402, 317, 14, 87, 178, 88, 95, 78, 191, 80, 81, 82, 13, 312, 311, 310, 415, 308]
-        # Lábio superior (apenas)
-        self.UPPER_LIP = [61, 185, 40, 39, 37, 0, 267, 269, 270, 409, 291]
-        # Lábio inferior (apenas)
-        self.LOWER_LIP = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291]
+        # Backend do modelo de landmarks: TensorRT FP16 (GPU CUDA) ou TFLite INT8, se
+        # configurados; o FaceMesh padrão continua sendo usado para detectar a face
+        if self.mediapipe_config['trt_engine_path'] and has_cuda_device():
+            self.face_mesh = TRTFaceMesh(
+                self.mediapipe_config['trt_engine_path'],
+                fallback=self.face_mesh,
+                min_tracking_confidence=self.mediapipe_config['min_tracking_confidence']
+            )
+        elif self.mediapipe_config['quantized_model_path']:
+            self.face_mesh = QuantizedFaceMesh(
+                self.mediapipe_config['quantized_model_path'],
+                fallback=self.face_mesh,
+                min_tracking_confidence=self.mediapipe_config['min_tracking_confidence']
+            )
+        
+        # Gravação dos recortes em segundo plano (JPEG encode + escrita em disco)
+        self._io_pool = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 1) // 4))
+        self._pending_saves = deque(maxlen=MAX_PENDING_SAVES)
+        
+        # Buffer da janela de preview do recorte (reutilizado a cada frame)
+        preview_w, preview_h = self.display_config['crop_preview_size']
+        self._preview = np.empty((preview_h, preview_w, 3), dtype=np.uint8)
+        
+        # Extrator de landmarks especializado para a resolução atual (criado no primeiro frame)
+        self._extract_lips = None
+        self._extractor_shape = None
+        
+        # Buffer RGB reutilizado entre frames (evita alocar um frame novo a cada conversão)
+        self._rgb_buf = None
+        
+        # Escala da entrada do Face Mesh: os landmarks são normalizados, então
+        # o recorte e os desenhos continuam usando o frame em resolução original
+        resize_config = self.performance_config['resize_for_processing']
+        self._process_scale = resize_config['scale'] if resize_config['enabled'] else 1.0
+        self._small_buf = None
         
         # Criar diretório para salvar recortes
         self.output_dir = os.path.join("lipvision", "data_collection", "data", self.save_config['mediapipe_output_dir'])
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Nomes dos recortes: contador sequencial + relógio monotônico (sem formatar datas)
+        self._crop_seq = itertools.count()
+        self._crop_filename_tmpl = os.path.join(self.output_dir, "lip_crop_{:08d}_{:d}.jpg")
+    
+    def _to_rgb(self, frame):
+        """Converte o frame BGR para RGB no buffer preallocado (o frame original não é alterado)"""
+        if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+            self._rgb_buf = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        return self._rgb_buf
+    
+    def _inference_input(self, frame):
+        """Prepara a entrada do Face Mesh: reduz o frame (se configurado) antes de converter para RGB"""
+        if self._process_scale != 1.0:
+            h, w = frame.shape[:2]
+            size = (max(1, int(w * self._process_scale)), max(1, int(h * self._process_scale)))
+            if self._small_buf is None or self._small_buf.shape[:2] != (size[1], size[0]):
+                self._small_buf = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            cv2.resize(frame, size, dst=self._small_buf, interpolation=cv2.INTER_AREA)
+            frame = self._small_buf
+        return self._to_rgb(frame)
+    
+    def _lip_extractor(self, img_height, img_width):
+        """Retorna o extrator para a resolução dada (recriado apenas quando ela muda)"""
+        if self._extractor_shape != (img_height, img_width):
+            self._extract_lips = self._make_lip_extractor(img_height, img_width)
+            self._extractor_shape = (img_height, img_width)
+        return self._extract_lips
     
     def get_lip_landmarks(self, landmarks, img_height, img_width):
-        """Extrai as coordenadas dos pontos dos lábios (contorno completo)"""
-        lip_coords = []
-        for idx in self.LIPS_OUTER:
-            x = int(landmarks[idx].x * img_width)
-            y = int(landmarks[idx].y * img_height)
-            lip_coords.append([x, y])
-        return np.array(lip_coords, dtype=np.int32)
+        """Extrai as coordenadas dos pontos dos lábios (contorno completo)
+        
+        Retorna uma cópia: os buffers do extrator são reutilizados apenas internamente.
+        """
+        _, outer, _, _ = self._lip_extractor(img_height, img_width)(landmarks)
+        return outer.copy()
 
     def get_lip_regions_separately(self, landmarks, img_height, img_width):
-        """Extrai as coordenadas dos pontos dos lábios superior e inferior separadamente"""
-        upper = []
-        lower = []
-        for idx in self.UPPER_LIP:
-            x = int(landmarks[idx].x * img_width)
-            y = int(landmarks[idx].y * img_height)
-            upper.append([x, y])
-        for idx in self.LOWER_LIP:
-            x = int(landmarks[idx].x * img_width)
-            y = int(landmarks[idx].y * img_height)
-            lower.append([x, y])
-        return np.array(upper, dtype=np.int32), np.array(lower, dtype=np.int32)
+        """Extrai as coordenadas dos pontos dos lábios superior e inferior separadamente
+        
+        Retorna cópias: os buffers do extrator são reutilizados apenas internamente.
+        """
+        _, _, upper, lower = self._lip_extractor(img_height, img_width)(landmarks)
+        return upper.copy(), lower.copy()
+    
+    def _make_lip_extractor(self, img_height, img_width):
+        """
+        Cria um extrator dos pontos dos lábios especializado para uma resolução fixa.
+        
+        Escala, conversão para int32 e separação das regiões acontecem sobre
+        buffers preallocados. Retorna (todos os pontos de LIP_INDICES, contorno
+        externo, lábio superior, lábio inferior); os arrays são reutilizados na
+        chamada seguinte, então não devem ser alterados nem guardados.
+        """
+        scale = np.array([img_width, img_height], dtype=np.float32)
+        indices = self.LIP_INDICES
+        upper_pos = self.UPPER_LIP_POS
+        lower_pos = self.LOWER_LIP_POS
+        src = np.empty((len(indices), 2), dtype=np.float32)
+        out = np.empty((len(indices), 2), dtype=np.int32)
+        outer_pos = self.LIPS_OUTER_POS
+        outer = np.empty((len(outer_pos), 2), dtype=np.int32)
+        upper = np.empty((len(upper_pos), 2), dtype=np.int32)
+        lower = np.empty((len(lower_pos), 2), dtype=np.int32)
+        
+        def extract(landmarks):
+            src.reshape(-1)[:] = np.fromiter(
+                itertools.chain.from_iterable((landmarks[idx].x, landmarks[idx].y) for idx in indices),
+                dtype=np.float32, count=src.size
+            )
+            np.multiply(src, scale, out=out, casting='unsafe')
+            np.take(out, outer_pos, axis=0, out=outer)
+            np.take(out, upper_pos, axis=0, out=upper)
+            np.take(out, lower_pos, axis=0, out=lower)
+            return out, outer, upper, lower
+        
+        return extract
     
     def crop_lip_region(self, image, lip_landmarks):
         """Recorta a região dos lábios da imagem (com margem aumentada)"""
-        # Encontrar bounding box dos lábios
-        x_min = np.min(lip_landmarks[:, 0])
-        x_max = np.max(lip_landmarks[:, 0])
-        y_min = np.min(lip_landmarks[:, 1])
-        y_max = np.max(lip_landmarks[:, 1])
-
-        # Aumentar a margem ao redor dos lábios (ex: 2x a margem padrão)
-        margin = int(self.mediapipe_config['lip_margin'] * 2)
-        x_min = max(0, x_min - margin)
-        x_max = min(image.shape[1], x_max + margin)
-        y_min = max(0, y_min - margin)
-        y_max = min(image.shape[0], y_max + margin)
+        # Encontrar bounding box dos lábios com margem aumentada (ex: 2x a margem padrão)
+        margin = self._lip_margin
+        x_min, y_min = np.maximum(lip_landmarks.min(axis=0) - margin, 0).tolist()
+        x_max, y_max = np.minimum(lip_landmarks.max(axis=0) + margin, (image.shape[1], image.shape[0])).tolist()
 
         # Recortar a região
         lip_crop = image[y_min:y_max, x_min:x_max]
 
         return lip_crop, (x_min, y_min, x_max, y_max)
     
-    def draw_lip_landmarks(self, image, lip_landmarks, landmarks=None, img_height=None, img_width=None):
-        """Desenha os pontos dos lábios na imagem, destacando superior e inferior"""
+    def _draw_points(self, image, points, color):
+        """Desenha todos os pontos de uma vez (polígonos fechados de um ponto = círculos de raio 2)"""
+        if self._draw_landmark_points:
+            cv2.polylines(image, points.reshape(-1, 1, 2), True, color, 4)
+    
+    def draw_lip_landmarks(self, image, lip_landmarks, landmarks=None, img_height=None, img_width=None,
+                           regions=None):
+        """Desenha os pontos dos lábios na imagem, destacando superior e inferior
+        
+        regions=(upper, lower) já em pixels evita recalcular a partir dos landmarks.
+        """
         # Desenhar contorno geral
         if lip_landmarks is not None and len(lip_landmarks) > 0:
             cv2.polylines(image, [lip_landmarks], True, (255, 255, 0), 2)
-            for point in lip_landmarks:
-                cv2.circle(image, tuple(point), 2, (0, 255, 255), -1)
+            self._draw_points(image, lip_landmarks, (0, 255, 255))
         # Se landmarks completos disponíveis, desenhar superior e inferior separados
-        if landmarks is not None and img_height is not None and img_width is not None:
-            upper, lower = self.get_lip_regions_separately(landmarks, img_height, img_width)
+        if regions is None and landmarks is not None and img_height is not None and img_width is not None:
+            regions = self.get_lip_regions_separately(landmarks, img_height, img_width)
+        if regions is not None:
+            upper, lower = regions
             if len(upper) > 0:
                 cv2.polylines(image, [upper], False, (0, 255, 0), 2)
-                for point in upper:
-                    cv2.circle(image, tuple(point), 2, (0, 255, 0), -1)
+                self._draw_points(image, upper, (0, 255, 0))
             if len(lower) > 0:
                 cv2.polylines(image, [lower], False, (0, 0, 255), 2)
-                for point in lower:
-                    cv2.circle(image, tuple(point), 2, (0, 0, 255), -1)
+                self._draw_points(image, lower, (0, 0, 255))
         return image
     
-    def process_frame(self, frame):
-        """Processa um frame para detectar e recortar lábios"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
+    def _motion_thumbnail(self, frame, dst):
+        """Reduz o frame para a miniatura de movimento em cinza (dst)"""
+        cv2.resize(frame, MOTION_THUMB_SIZE, dst=self._motion_thumb, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._motion_thumb, cv2.COLOR_BGR2GRAY, dst=dst)
+        return dst
+    
+    def _large_motion(self, frame):
+        """Verifica se a região da boca mudou muito desde a última detecção"""
+        if self._motion_ref is None:
+            return True
+        current = self._motion_thumbnail(frame, self._motion_cur)
+        roi = self._motion_roi if self._motion_roi is not None else np.s_[:, :]
+        diff = cv2.absdiff(current[roi], self._motion_ref[roi])
+        return cv2.mean(diff)[0] > self._motion_threshold
+    
+    def _set_motion_roi(self, frame_shape, bbox):
+        """Converte o bounding box da boca para coordenadas da miniatura de movimento"""
+        if bbox is None:
+            self._motion_roi = None
+            return
+        h, w = frame_shape[:2]
+        thumb_w, thumb_h = MOTION_THUMB_SIZE
+        x1, y1, x2, y2 = bbox
+        tx1, ty1 = x1 * thumb_w // w, y1 * thumb_h // h
+        tx2 = max(tx1 + 1, -(-x2 * thumb_w // w))
+        ty2 = max(ty1 + 1, -(-y2 * thumb_h // h))
+        self._motion_roi = np.s_[ty1:ty2, tx1:tx2]
+    
+    def process_frame(self, frame, draw=True):
+        """Processa um frame para detectar e recortar lábios
+        
+        O recorte é extraído antes das anotações, então não contém os desenhos.
+        Com draw=False nada é desenhado e o recorte é uma view do frame (sem cópia).
+        A abertura da boca medida na mesma passada fica em self.mouth_distance
+        e os landmarks usados em self.last_landmarks.
+        """
+        detect = (self._tick % self._frame_skip == 0 or not self.last_landmarks or
+                  (self._motion_threshold and self._large_motion(frame)))
+        track_motion = self._frame_skip > 1 and self._motion_threshold
+        if detect:
+            self._tick = 0
+            if track_motion:
+                # Referência do movimento: o frame em que o Face Mesh rodou (antes dos desenhos)
+                if self._motion_ref is None:
+                    self._motion_ref = np.empty_like(self._motion_cur)
+                self._motion_thumbnail(frame, self._motion_ref)
+            results = self.face_mesh.process(self._inference_input(frame))
+            self.last_landmarks = results.multi_face_landmarks
+        self._tick += 1
         lip_crop = None
         bbox = None
-        if results.multi_face_landmarks:
-            for face_landmarks in results.multi_face_landmarks:
-                h, w, _ = frame.shape
-                lip_landmarks = self.get_lip_landmarks(face_landmarks.landmark, h, w)
-                # Desenhar superior (verde) e inferior (vermelho) além do contorno geral
-                frame = self.draw_lip_landmarks(frame, lip_landmarks, face_landmarks.landmark, h, w)
-                # Recortar região dos lábios
+        self.mouth_distance = None
+        if self.last_landmarks:
+            h, w, _ = frame.shape
+            extract_lips = self._lip_extractor(h, w)
+            for face_landmarks in self.last_landmarks:
+                lip_pixels, lip_landmarks, upper, lower = extract_lips(face_landmarks.landmark)
+                self.mouth_distance = int(abs(lip_pixels[self.MOUTH_LOWER_POS, 1] -
+                                              lip_pixels[self.MOUTH_UPPER_POS, 1]))
+                # Recortar região dos lábios antes de qualquer anotação
                 lip_crop, bbox = self.crop_lip_region(frame, lip_landmarks)
+                if not draw:
+                    continue
+                # O recorte é uma view do frame: copiar antes de desenhar sobre ele
+                lip_crop = lip_crop.copy()
+                # Desenhar superior (verde) e inferior (vermelho) além do contorno geral
+                frame = self.draw_lip_landmarks(frame, lip_landmarks, regions=(upper, lower))
                 # Desenhar bounding box
                 cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), (0, 255, 255), 2)
                 cv2.putText(frame, "Lips", (bbox[0], bbox[1]-10), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        if detect and track_motion:
+            self._set_motion_roi(frame.shape, bbox)
         return frame, lip_crop, bbox
     
+    def detect_mouth(self, frame, debug=False):
+        """Detecta se a boca está aberta em uma única passada do MediaPipe
+        
+        Com debug as anotações são feitas em uma cópia; sem debug o frame não é alterado.
+        Retorna mouth_open, debug_frame, lip_crop_clean (sem pontos do MediaPipe)
+        """
+        debug_frame = frame.copy() if debug else frame
+        debug_frame, lip_crop_clean, _ = self.process_frame(debug_frame, draw=debug)
+        mouth_open = self.mouth_distance is not None and self.mouth_distance > self._mouth_open_distance
+        return mouth_open, debug_frame, lip_crop_clean
+    
+    def _crop_filename(self):
+        """Gera o caminho de saída para um novo recorte"""
+        return self._crop_filename_tmpl.format(next(self._crop_seq), time.monotonic_ns())
+    
     def save_lip_crop(self, lip_crop):
-        """Salva o recorte dos lábios"""
+        """Salva o recorte dos lábios (a gravação acontece em segundo plano)"""
         if lip_crop is not None and lip_crop.size > 0:
-            timestamp = datetime.now().strftime(self.save_config['timestamp_format'])[:-3]
-            filename = f"{self.output_dir}/lip_crop_{timestamp}.jpg"
+            filename = self._crop_filename()
+            
+            # Limitar recortes pendentes: esperar o mais antigo se a fila estiver cheia
+            if len(self._pending_saves) == self._pending_saves.maxlen:
+                self._pending_saves[0].result()
             
+            # Copiar o recorte: ele é uma view do frame atual
             # Salvar com qualidade configurada
-            cv2.imwrite(filename, lip_crop, [cv2.IMWRITE_JPEG_QUALITY, self.save_config['jpeg_quality']])
+            self._pending_saves.append(self._io_pool.submit(
+                cv2.imwrite, filename, lip_crop.copy(),
+                [cv2.IMWRITE_JPEG_QUALITY, self.save_config['jpeg_quality']]
+            ))
             return filename
         return None
     
+    def wait_pending_saves(self):
+        """Aguarda a gravação de todos os recortes pendentes"""
+        while self._pending_saves:
+            self._pending_saves.popleft().result()
+    
+    def close(self):
+        """Conclui as gravações pendentes e libera o Face Mesh (o detector não pode ser usado depois)"""
+        if self._face_mesh_key is None:
+            return
+        self.wait_pending_saves()
+        self._io_pool.shutdown()
+        if self.face_mesh is not _FACE_MESHES.get(self._face_mesh_key):
+            # Backend TFLite/TensorRT: reinicia o rastreamento (o fallback é liberado abaixo)
+            self.face_mesh.close()
+        _release_face_mesh(self._face_mesh_key)
+        self._face_mesh_key = None
+    
     def run_camera(self):
-        """Executa a detecção em tempo real usando a câmera"""
-        cap = cv2.VideoCapture(0)
+        """Executa a detecção em tempo real usando a câmera
+        
+        Pipeline em três estágios: uma thread lê frames da câmera, a thread
+        principal processa/exibe e os recortes são gravados em segundo plano.
+        """
+        cap = open_camera(self.camera_config)
         
         if not cap.isOpened():
             print("Erro: Não foi possível abrir a câmera")
             return
         
+        reader = FrameReader(cap, PIPELINE_QUEUE_SIZE)
+        
+        preview_size = self.display_config['crop_preview_size']
+        
+        # Instruções fixas: rasterizar o texto uma única vez
+        help_overlay = TextOverlay("Pressione 'c' para capturar, 'q' para sair",
+                                   (10, 30), 0.7, (255, 255, 255), 2)
+        
         print("Iniciando detecção de lábios...")
         print("Pressione 'c' para capturar um recorte dos lábios")
         print("Pressione 'q' para sair")
         
         while True:
-            ret, frame = cap.read()
-            if not ret:
+            frame = reader.read()
+            if frame is None:
                 print("Erro: Não foi possível ler o frame da câmera")
                 break
             
-            # Espelhar a imagem horizontalmente para parecer natural
-            frame = cv2.flip(frame, 1)
+            # Espelhar a imagem horizontalmente para parecer natural (sem alocar outro frame)
+            if self.camera_config['flip_horizontal']:
+                cv2.flip(frame, 1, dst=frame)
             
             # Processar frame
             processed_frame, lip_crop, bbox = self.process_frame(frame)
             
-            # Mostrar instruções na tela
-            cv2.putText(processed_frame, "Pressione 'c' para capturar, 'q' para sair", 
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            # Mostrar instruções na tela (texto pré-renderizado)
+            help_overlay.apply(processed_frame)
             
             # Mostrar frame principal
             cv2.imshow('Lip Detection', processed_frame)
             
-            # Mostrar recorte dos lábios se disponível
+            # Mostrar recorte dos lábios se disponível (redimensionado no buffer de preview)
             if lip_crop is not None and lip_crop.size > 0:
-                # Redimensionar para visualização melhor
-                if lip_crop.shape[0] > 0 and lip_crop.shape[1] > 0:
-                    lip_resized = cv2.resize(lip_crop, (200, 100))
-                    cv2.imshow('Lip Crop', lip_resized)
+                cv2.resize(lip_crop, preview_size, dst=self._preview)
+                cv2.imshow('Lip Crop', self._preview)
             
             # Processar teclas
             key = cv2.waitKey(1) & 0xFF
@@ -183,14 +495,19 @@ class LipDetector:
                 else:
                     print("Nenhum lábio detectado para capturar")
         
-        # Limpar recursos
+        # Encerrar threads, concluir gravações pendentes e limpar recursos
+        reader.stop()
+        self.wait_pending_saves()
         cap.release()
         cv2.destroyAllWindows()
 
 def main():
     """Função principal"""
     detector = LipDetector()
-    detector.run_camera()
+    try:
+        detector.run_camera()
+    finally:
+        detector.close()
 
 if __name__ == "__main__":
     main()
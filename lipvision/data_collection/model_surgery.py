@@ -0,0 +1,156 @@
+"""
+Cirurgia de grafo para os modelos TFLite do MediaPipe
+
+Os modelos de face do MediaPipe usam operações PAD explícitas antes de
+convoluções VALID. Quando o padding adicionado é exatamente o padding SAME
+da convolução seguinte, o PAD pode ser removido e a convolução passa a usar
+padding SAME — a saída é idêntica e o runtime evita uma cópia do tensor.
+
+O modelo resultante pode ser usado no LipDetector através de
+MEDIAPIPE_CONFIG['quantized_model_path'].
+
+Uso:
+    python -m lipvision.data_collection.model_surgery face_landmark.tflite face_landmark_folded.tflite
+"""
+
+import sys
+import numpy as np
+
+# Identificador de arquivo dos flatbuffers TFLite
+TFLITE_FILE_IDENTIFIER = b'TFL3'
+
+
+def _load_schema():
+    """Importa o schema do flatbuffer TFLite (requer tensorflow e flatbuffers)"""
+    try:
+        import flatbuffers
+        from tensorflow.lite.python import schema_py_generated as schema_fb
+    except ImportError as e:
+        raise ImportError("A cirurgia do modelo requer 'tensorflow' e 'flatbuffers' instalados") from e
+    return flatbuffers, schema_fb
+
+
+def _builtin_code(opcode):
+    """Código do operador (campos novo e legado do schema)"""
+    return max(opcode.builtinCode, opcode.deprecatedBuiltinCode)
+
+
+def _same_padding(in_size, kernel, stride):
+    """Padding (antes, depois) aplicado pelo modo SAME do TensorFlow"""
+    out_size = -(-in_size // stride)
+    total = max((out_size - 1) * stride + kernel - in_size, 0)
+    return total // 2, total - total // 2
+
+
+def _constant_tensor(model, tensor, schema_fb):
+    """Lê o conteúdo de um tensor constante (ou None se não for constante)"""
+    data = model.buffers[tensor.buffer].data
+    if data is None:
+        return None
+    dtype = np.int64 if tensor.type == schema_fb.TensorType.INT64 else np.int32
+    return np.frombuffer(bytes(data), dtype=dtype)
+
+
+def fold_pad_into_conv(model, schema_fb):
+    """
+    Remove PADs cujo único consumidor é uma convolução VALID com o padding
+    SAME equivalente.
+
+    Returns:
+        int: Número de operações PAD removidas
+    """
+    conv_codes = (schema_fb.BuiltinOperator.CONV_2D, schema_fb.BuiltinOperator.DEPTHWISE_CONV_2D)
+    folded = 0
+
+    for subgraph in model.subgraphs:
+        consumers = {}
+        for op in subgraph.operators:
+            for tensor_idx in op.inputs:
+                consumers.setdefault(int(tensor_idx), []).append(op)
+
+        graph_outputs = set(int(t) for t in subgraph.outputs)
+        remove = []
+
+        for op in subgraph.operators:
+            if _builtin_code(model.operatorCodes[op.opcodeIndex]) != schema_fb.BuiltinOperator.PAD:
+                continue
+
+            pad_out = int(op.outputs[0])
+            users = consumers.get(pad_out, [])
+            if pad_out in graph_outputs or len(users) != 1:
+                continue
+            conv = users[0]
+            if _builtin_code(model.operatorCodes[conv.opcodeIndex]) not in conv_codes:
+                continue
+            if int(conv.inputs[0]) != pad_out:
+                continue
+
+            options = conv.builtinOptions
+            if options.padding != schema_fb.Padding.VALID:
+                continue
+            if options.dilationHFactor != 1 or options.dilationWFactor != 1:
+                continue
+
+            paddings = _constant_tensor(model, subgraph.tensors[int(op.inputs[1])], schema_fb)
+            if paddings is None or paddings.size != 8:
+                continue
+            paddings = paddings.reshape(4, 2)
+
+            # Apenas padding espacial (NHWC): batch e canais devem ficar intactos
+            if paddings[0].any() or paddings[3].any():
+                continue
+
+            in_shape = subgraph.tensors[int(op.inputs[0])].shape
+            kernel_shape = subgraph.tensors[int(conv.inputs[1])].shape
+            expected = (
+                _same_padding(in_shape[1], kernel_shape[1], options.strideH),
+                _same_padding(in_shape[2], kernel_shape[2], options.strideW),
+            )
+            if tuple(paddings[1]) != expected[0] or tuple(paddings[2]) != expected[1]:
+                continue
+
+            # Ligar a convolução diretamente à entrada do PAD
+            conv.inputs[0] = op.inputs[0]
+            options.padding = schema_fb.Padding.SAME
+            remove.append(op)
+
+        for op in remove:
+            subgraph.operators.remove(op)
+        folded += len(remove)
+
+    return folded
+
+
+def rewrite_model(src_path, dst_path):
+    """
+    Aplica a cirurgia em um arquivo .tflite e salva o resultado.
+
+    Returns:
+        int: Número de operações PAD removidas
+    """
+    flatbuffers, schema_fb = _load_schema()
+
+    with open(src_path, 'rb') as f:
+        buf = f.read()
+    model = schema_fb.ModelT.InitFromObj(schema_fb.Model.GetRootAsModel(buf, 0))
+
+    folded = fold_pad_into_conv(model, schema_fb)
+
+    builder = flatbuffers.Builder(len(buf))
+    builder.Finish(model.Pack(builder), file_identifier=TFLITE_FILE_IDENTIFIER)
+    with open(dst_path, 'wb') as f:
+        f.write(builder.Output())
+    return folded
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    folded = rewrite_model(sys.argv[1], sys.argv[2])
+    print(f"✅ {folded} operações PAD incorporadas às convoluções: {sys.argv[2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Sobreposições de texto estático para as janelas de visualização
+"""
+
+import cv2
+import numpy as np
+
+
+class TextOverlay:
+    """Texto fixo rasterizado uma única vez e copiado para cada frame"""
+
+    def __init__(self, text, org, font_scale, color, thickness, font=cv2.FONT_HERSHEY_SIMPLEX):
+        (text_w, text_h), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+        x, y = org
+
+        # Região do frame ocupada pelo texto (com folga para a espessura do traço)
+        self._x0 = max(0, x - thickness)
+        self._y0 = max(0, y - text_h - thickness)
+        self._x1 = x + text_w + thickness
+        self._y1 = y + baseline + thickness
+
+        local_org = (x - self._x0, y - self._y0)
+        shape = (self._y1 - self._y0, self._x1 - self._x0)
+
+        # Máscara dos pixels do texto (a cor é uniforme, então basta copiá-la onde a máscara é ativa)
+        coverage = np.zeros(shape, dtype=np.uint8)
+        cv2.putText(coverage, text, local_org, font, font_scale, 255, thickness)
+        self._mask = cv2.threshold(coverage, 127, 255, cv2.THRESH_BINARY)[1]
+        self._patch = np.full(shape + (3,), color, dtype=np.uint8)
+
+    def apply(self, frame):
+        """Copia o texto para o frame (in-place) e retorna o frame"""
+        roi = frame[self._y0:self._y1, self._x0:self._x1]
+        h, w = roi.shape[:2]
+        cv2.copyTo(self._patch[:h, :w], self._mask[:h, :w], roi)
+        return frame
@@ -0,0 +1,249 @@
+"""
+Face Mesh quantizado (INT8) executado diretamente em um interpretador TFLite
+
+O modelo de landmarks do MediaPipe recebe um recorte quadrado da face
+(192x192). Aqui o recorte é obtido a partir dos landmarks do frame anterior
+(rastreamento), e o FaceMesh original do MediaPipe é usado apenas para a
+detecção inicial ou quando o rastreamento é perdido.
+
+O objeto retornado por `process` imita a API do MediaPipe
+(`results.multi_face_landmarks[i].landmark[j].x/.y/.z`), então o restante
+do código (get_lip_landmarks, crop_lip_region...) não precisa mudar.
+"""
+
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+# Número de landmarks do modelo base do Face Mesh
+NUM_FACE_LANDMARKS = 468
+
+# Fator de expansão do ROI da face em relação ao bounding box dos landmarks
+ROI_SCALE = 1.5
+
+
+class _Landmark:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class _FaceLandmarks:
+    __slots__ = ('landmark',)
+
+    def __init__(self, landmark):
+        self.landmark = landmark
+
+
+class _FaceMeshResult:
+    __slots__ = ('multi_face_landmarks',)
+
+    def __init__(self, multi_face_landmarks):
+        self.multi_face_landmarks = multi_face_landmarks
+
+
+def _load_interpreter(model_path, num_threads):
+    """Carrega o interpretador TFLite (tflite_runtime ou tensorflow)"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        except ImportError as e:
+            raise ImportError(
+                "QuantizedFaceMesh requer 'tflite-runtime' ou 'tensorflow' instalado"
+            ) from e
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+def _dequantize(values, detail):
+    """Converte a saída quantizada (int8/uint8) de volta para float32"""
+    scale, zero_point = detail['quantization']
+    if values.dtype in (np.int8, np.uint8) and scale:
+        return (values.astype(np.float32) - zero_point) * scale
+    return values.astype(np.float32)
+
+
+class TrackingFaceMesh(ABC):
+    """
+    Base para backends que executam apenas o modelo de landmarks.
+
+    Mantém o ROI da face a partir dos landmarks do frame anterior e usa o
+    FaceMesh do MediaPipe (fallback) para detectar a face quando não há
+    rastreamento. Subclasses informam o tamanho de entrada do modelo
+    (largura, altura) e implementam `_infer`.
+    """
+
+    def __init__(self, fallback, input_size, min_tracking_confidence=0.5):
+        self.fallback = fallback
+        self.min_tracking_confidence = min_tracking_confidence
+        self._input_w, self._input_h = input_size
+
+        # ROI (centro x, centro y, lado) em pixels, derivado do frame anterior
+        self._roi = None
+
+    @abstractmethod
+    def _infer(self, crop):
+        """
+        Executa o modelo em um recorte RGB uint8 do tamanho de entrada.
+
+        Returns:
+            tuple: (landmarks (468, 3) float32 em pixels do recorte,
+                    logit de presença da face ou None)
+        """
+
+    def _roi_from_landmarks(self, points, img_height, img_width):
+        """Calcula o ROI quadrado da face a partir de landmarks normalizados"""
+        xs = points[:, 0] * img_width
+        ys = points[:, 1] * img_height
+        x_min, x_max = xs.min(), xs.max()
+        y_min, y_max = ys.min(), ys.max()
+        side = max(x_max - x_min, y_max - y_min) * ROI_SCALE
+        return ((x_min + x_max) / 2, (y_min + y_max) / 2, side)
+
+    def _run_landmark_model(self, rgb_frame):
+        """Executa o modelo no ROI atual; retorna landmarks normalizados (468, 3) ou None"""
+        img_height, img_width = rgb_frame.shape[:2]
+        cx, cy, side = self._roi
+
+        # Transformação afim ROI -> entrada do modelo (bordas fora da imagem ficam pretas)
+        sx = self._input_w / side
+        sy = self._input_h / side
+        matrix = np.array([[sx, 0, self._input_w / 2 - cx * sx],
+                           [0, sy, self._input_h / 2 - cy * sy]], dtype=np.float32)
+        crop = cv2.warpAffine(rgb_frame, matrix, (self._input_w, self._input_h),
+                              flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+
+        points, flag = self._infer(crop)
+        if flag is not None:
+            score = 1.0 / (1.0 + np.exp(-flag))
+            if score < self.min_tracking_confidence:
+                return None
+
+        # Coordenadas do recorte -> coordenadas normalizadas da imagem
+        points = points.reshape(NUM_FACE_LANDMARKS, 3).copy()
+        points[:, 0] = (points[:, 0] / sx + (cx - side / 2)) / img_width
+        points[:, 1] = (points[:, 1] / sy + (cy - side / 2)) / img_height
+        points[:, 2] = points[:, 2] / sx / img_width
+        return points
+
+    def process(self, rgb_frame):
+        """Processa um frame RGB retornando resultados no formato do MediaPipe"""
+        img_height, img_width = rgb_frame.shape[:2]
+
+        points = self._run_landmark_model(rgb_frame) if self._roi is not None else None
+
+        if points is None:
+            # Sem rastreamento: usar o FaceMesh original para localizar a face
+            self._roi = None
+            results = self.fallback.process(rgb_frame)
+            if not results.multi_face_landmarks:
+                return _FaceMeshResult(None)
+            landmark = results.multi_face_landmarks[0].landmark
+            points = np.array([(l.x, l.y, l.z) for l in landmark[:NUM_FACE_LANDMARKS]], dtype=np.float32)
+            self._roi = self._roi_from_landmarks(points, img_height, img_width)
+            return results
+
+        self._roi = self._roi_from_landmarks(points, img_height, img_width)
+        landmark = [_Landmark(float(x), float(y), float(z)) for x, y, z in points]
+        return _FaceMeshResult([_FaceLandmarks(landmark)])
+
+    def close(self):
+        """Reinicia o rastreamento (o FaceMesh de fallback é compartilhado e liberado por quem o criou)"""
+        self._roi = None
+
+
+class QuantizedFaceMesh(TrackingFaceMesh):
+    def __init__(self, model_path, fallback, min_tracking_confidence=0.5, num_threads=1):
+        """
+        Args:
+            model_path (str): Caminho do face_landmark.tflite quantizado (INT8)
+            fallback: FaceMesh do MediaPipe usado para (re)detectar a face
+            min_tracking_confidence (float): Confiança mínima para manter o rastreamento
+            num_threads (int): Threads do interpretador TFLite
+        """
+        self.interpreter = _load_interpreter(model_path, num_threads)
+        self.interpreter.allocate_tensors()
+
+        input_detail = self.interpreter.get_input_details()[0]
+        self._input_index = input_detail['index']
+        self._input_dtype = input_detail['dtype']
+        self._input_quant = input_detail['quantization']
+        _, input_h, input_w, _ = input_detail['shape']
+        super().__init__(fallback, (int(input_w), int(input_h)), min_tracking_confidence)
+
+        # Identificar as saídas pelo tamanho: landmarks (468*3) e presença da face (1)
+        self._landmarks_detail = None
+        self._flag_detail = None
+        for detail in self.interpreter.get_output_details():
+            size = int(np.prod(detail['shape']))
+            if size == NUM_FACE_LANDMARKS * 3 and self._landmarks_detail is None:
+                self._landmarks_detail = detail
+            elif size == 1 and self._flag_detail is None:
+                self._flag_detail = detail
+        if self._landmarks_detail is None:
+            raise ValueError(f"Modelo sem saída de {NUM_FACE_LANDMARKS} landmarks: {model_path}")
+
+    def _prepare_input(self, crop):
+        """Converte o recorte RGB uint8 para o tipo/quantização de entrada do modelo"""
+        if self._input_dtype == np.float32:
+            return (crop.astype(np.float32) / 255.0)[np.newaxis]
+        scale, zero_point = self._input_quant
+        info = np.iinfo(self._input_dtype)
+        if self._input_dtype == np.uint8 and abs(scale - 1.0 / 255.0) < 1e-6 and zero_point == 0:
+            # Quantização identidade: os pixels já estão no domínio esperado
+            return crop[np.newaxis]
+        quantized = np.round(crop.astype(np.float32) / 255.0 / scale + zero_point)
+        return np.clip(quantized, info.min, info.max).astype(self._input_dtype)[np.newaxis]
+
+    def _infer(self, crop):
+        """Executa o interpretador TFLite e dequantiza as saídas"""
+        self.interpreter.set_tensor(self._input_index, self._prepare_input(crop))
+        self.interpreter.invoke()
+
+        flag = None
+        if self._flag_detail is not None:
+            flag = _dequantize(self.interpreter.get_tensor(self._flag_detail['index']),
+                               self._flag_detail).item()
+
+        raw = self.interpreter.get_tensor(self._landmarks_detail['index'])
+        return _dequantize(raw, self._landmarks_detail), flag
+
+
+def quantize_face_landmark_model(saved_model_dir, output_path, representative_frames):
+    """
+    Gera um face_landmark.tflite INT8 por quantização pós-treino.
+
+    O TFLiteConverter não converte a partir de um .tflite, então o grafo de
+    landmarks precisa estar exportado como SavedModel (ex.: via tflite2tensorflow).
+
+    Args:
+        saved_model_dir (str): Diretório do SavedModel do modelo de landmarks
+        output_path (str): Caminho do .tflite quantizado a ser gerado
+        representative_frames: Iterável de recortes RGB uint8 da face (~100),
+            usados para calibrar as faixas de ativação
+    """
+    import tensorflow as tf
+
+    frames = list(representative_frames)
+
+    def representative_dataset():
+        for frame in frames:
+            crop = cv2.resize(frame, (192, 192)).astype(np.float32) / 255.0
+            yield [crop[np.newaxis]]
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+    return output_path
@@ -1,8 +1,23 @@
 import cv2
 import numpy as np
 import os
-from datetime import datetime
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from .config import get_config
+from .overlay import TextOverlay
+from .camera import open_camera, FrameReader
+
+# Máximo de recortes aguardando gravação em disco
+MAX_PENDING_SAVES = 32
+
+
+def _has_mosse_tracker():
+    """Verifica se o rastreador MOSSE (opencv-contrib) está disponível"""
+    return hasattr(getattr(cv2, 'legacy', None), 'TrackerMOSSE_create')
+# Máximo de tamanhos de face com limites da boca em cache
+MAX_CACHED_FACE_SIZES = 256
 
 class SimpleLipDetector:
     def __init__(self):
@@ -10,70 +25,153 @@ class SimpleLipDetector:
         # Carregar configurações
         self.simple_config = get_config('simple')
         self.save_config = get_config('save')
+        self.camera_config = get_config('camera')
+        
+        # Carregar o classificador de face (Haar ou LBP)
+        self.face_cascade = self._load_face_cascade()
         
-        # Carregar classificadores Haar para face e boca
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        # Detecção a cada N frames, com rastreamento da face entre as detecções
+        self._detect_every = max(1, self.simple_config['detect_every'])
+        if self._detect_every > 1 and not _has_mosse_tracker():
+            # Sem rastreador a face ficaria parada entre as detecções: detectar em todos os frames
+            print("⚠️  Rastreador MOSSE indisponível (requer opencv-contrib): detectando a face em todos os frames")
+            self._detect_every = 1
+        self._detection_scale = self.simple_config['detection_scale']
+        
+        # Limites da região da boca por tamanho de face (h, w), calculados uma única vez
+        self._mouth_bounds = {}
+        self._frame_count = 0
+        self._last_faces = ()
+        self._tracker = None
+        
+        # Buffers em cinza (resolução original e reduzida) reutilizados entre frames
+        self._gray_buf = None
+        self._small_buf = None
+        
+        # Gravação dos recortes em segundo plano (JPEG encode + escrita em disco)
+        self._io_pool = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 1) // 4))
+        self._pending_saves = deque(maxlen=MAX_PENDING_SAVES)
         
         # Criar diretório para salvar recortes
         self.output_dir = os.path.join("lipvision", "data_collection", "data", self.save_config['simple_output_dir'])
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
+        
+        # Nomes dos recortes: contador sequencial + instante monotônico (mesmo esquema
+        # do LipDetector; dois recortes no mesmo milissegundo não se sobrescrevem)
+        self._crop_seq = itertools.count()
+        self._crop_filename_tmpl = os.path.join(self.output_dir, "mouth_crop_{:08d}_{:d}.jpg")
+    
+    def _load_face_cascade(self):
+        """Carrega o cascade de face configurado (LBP cai para Haar se o XML não existir)"""
+        if self.simple_config['detector_backend'] == 'lbp':
+            cascade = cv2.CascadeClassifier(self.simple_config['lbp_cascade_path'])
+            if not cascade.empty():
+                return cascade
+            print(f"❌ Cascade LBP não encontrado: {self.simple_config['lbp_cascade_path']} (usando Haar)")
+        return cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
     
     def detect_mouth_region(self, face_roi):
         """Detecta a região da boca dentro da face"""
         # A boca geralmente está na metade inferior da face
-        h, w = face_roi.shape[:2]
-        
-        # Usar configurações do arquivo config.py
-        mouth_region = self.simple_config['mouth_region']
-        
-        # Definir região de interesse para a boca
-        mouth_y_start = int(h * mouth_region['y_start_ratio'])
-        mouth_y_end = int(h * mouth_region['y_end_ratio'])
-        mouth_x_start = int(w * mouth_region['x_start_ratio'])
-        mouth_x_end = int(w * mouth_region['x_end_ratio'])
+        key = face_roi.shape[:2]
+        bounds = self._mouth_bounds.get(key)
+        if bounds is None:
+            # Definir região de interesse para a boca (configurações do arquivo config.py)
+            h, w = key
+            mouth_region = self.simple_config['mouth_region']
+            bounds = (int(w * mouth_region['x_start_ratio']), int(h * mouth_region['y_start_ratio']),
+                      int(w * mouth_region['x_end_ratio']), int(h * mouth_region['y_end_ratio']))
+            if len(self._mouth_bounds) >= MAX_CACHED_FACE_SIZES:
+                self._mouth_bounds.clear()
+            self._mouth_bounds[key] = bounds
+        mouth_x_start, mouth_y_start, mouth_x_end, mouth_y_end = bounds
         
         mouth_roi = face_roi[mouth_y_start:mouth_y_end, mouth_x_start:mouth_x_end]
         
-        return mouth_roi, (mouth_x_start, mouth_y_start, mouth_x_end, mouth_y_end)
+        return mouth_roi, bounds
     
     def enhance_mouth_detection(self, mouth_roi):
         """Aplica filtros para melhorar a detecção da boca"""
         if mouth_roi.size == 0:
             return mouth_roi
         
-        # Converter para escala de cinza se necessário
+        # Recorte colorido: aplicar filtro bilateral para suavizar mantendo bordas
+        # (a equalização em cinza só é usada para recortes já em escala de cinza)
         if len(mouth_roi.shape) == 3:
-            gray_mouth = cv2.cvtColor(mouth_roi, cv2.COLOR_BGR2GRAY)
-        else:
-            gray_mouth = mouth_roi
+            return cv2.bilateralFilter(mouth_roi, 9, 75, 75)
         
         # Aplicar equalização de histograma
-        enhanced = cv2.equalizeHist(gray_mouth)
+        return cv2.equalizeHist(mouth_roi)
+    
+    def _to_gray(self, frame):
+        """Converte o frame BGR para cinza no buffer preallocado (válido até o próximo frame)"""
+        if self._gray_buf is None or self._gray_buf.shape != frame.shape[:2]:
+            self._gray_buf = np.empty(frame.shape[:2], dtype=np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
+        return self._gray_buf
+    
+    def _create_tracker(self, gray, face):
+        """Inicia um rastreador MOSSE na face detectada (None se o opencv-contrib não estiver disponível)"""
+        if not _has_mosse_tracker():
+            return None
+        tracker = cv2.legacy.TrackerMOSSE_create()
+        tracker.init(gray, tuple(int(v) for v in face))
+        return tracker
+    
+    def _detect_faces(self, gray):
+        """Detecta faces com o Haar cascade a cada N frames e rastreia a face nos demais"""
+        tick = self._frame_count
+        self._frame_count += 1
         
-        # Aplicar filtro bilateral para suavizar mantendo bordas
-        if len(mouth_roi.shape) == 3:
-            enhanced_color = cv2.bilateralFilter(mouth_roi, 9, 75, 75)
-            return enhanced_color
-        else:
-            return enhanced
+        if tick % self._detect_every != 0 and len(self._last_faces) > 0:
+            if self._tracker is None:
+                return self._last_faces
+            ok, (x, y, w, h) = self._tracker.update(gray)
+            if ok:
+                # Limitar a caixa ao frame (o MOSSE pode estendê-la além das bordas)
+                img_h, img_w = gray.shape[:2]
+                x1, y1 = max(int(x), 0), max(int(y), 0)
+                x2, y2 = min(int(x + w), img_w), min(int(y + h), img_h)
+                if x2 > x1 and y2 > y1:
+                    self._last_faces = ((x1, y1, x2 - x1, y2 - y1),)
+                    return self._last_faces
+            # Rastreamento perdido (ou caixa fora do frame): detectar novamente neste frame
+        
+        # Cascade na imagem reduzida; bounding boxes reescalados para o frame original
+        small = gray
+        if self._detection_scale != 1.0:
+            # O buffer só é realocado pelo OpenCV se a resolução mudar
+            self._small_buf = cv2.resize(gray, None, fx=self._detection_scale, fy=self._detection_scale,
+                                         dst=self._small_buf, interpolation=cv2.INTER_AREA)
+            small = self._small_buf
+        faces = self.face_cascade.detectMultiScale(small, 
+                                                   self.simple_config['scale_factor'], 
+                                                   self.simple_config['min_neighbors'])
+        if len(faces) > 0 and self._detection_scale != 1.0:
+            faces = np.rint(faces / self._detection_scale).astype(np.int32)
+        self._last_faces = faces
+        self._tracker = self._create_tracker(gray, faces[0]) if len(faces) > 0 else None
+        return faces
     
-    def process_frame(self, frame):
-        """Processa um frame para detectar e extrair a região da boca"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def process_frame(self, frame, draw=True):
+        """Processa um frame para detectar e extrair a região da boca
+        
+        Com draw=False nada é desenhado no frame.
+        """
+        gray = self._to_gray(frame)
         
-        # Detectar faces
-        faces = self.face_cascade.detectMultiScale(gray, 
-                                                    self.simple_config['scale_factor'], 
-                                                    self.simple_config['min_neighbors'])
+        # Detectar faces (ou rastrear a última detecção)
+        faces = self._detect_faces(gray)
         
         mouth_crop = None
         mouth_bbox = None
         
         for (x, y, w, h) in faces:
             # Desenhar retângulo ao redor da face
-            cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
-            cv2.putText(frame, "Face", (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+            if draw:
+                cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+                cv2.putText(frame, "Face", (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
             
             # Extrair ROI da face
             face_roi = frame[y:y+h, x:x+w]
@@ -89,10 +187,11 @@ class SimpleLipDetector:
                 abs_mouth_y2 = y + mouth_coords[3]
                 
                 # Desenhar retângulo ao redor da boca
-                cv2.rectangle(frame, (abs_mouth_x1, abs_mouth_y1), 
-                             (abs_mouth_x2, abs_mouth_y2), (0, 255, 0), 2)
-                cv2.putText(frame, "Mouth", (abs_mouth_x1, abs_mouth_y1-10), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+                if draw:
+                    cv2.rectangle(frame, (abs_mouth_x1, abs_mouth_y1), 
+                                 (abs_mouth_x2, abs_mouth_y2), (0, 255, 0), 2)
+                    cv2.putText(frame, "Mouth", (abs_mouth_x1, abs_mouth_y1-10), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
                 
                 # Melhorar a qualidade do recorte da boca
                 mouth_crop = self.enhance_mouth_detection(mouth_roi)
@@ -103,44 +202,97 @@ class SimpleLipDetector:
         
         return frame, mouth_crop, mouth_bbox
     
+    def detect_mouth(self, frame, debug=False):
+        """Detecta se a boca está aberta pela proporção da região da boca
+        
+        Com debug as anotações são feitas em uma cópia; sem debug o frame não é alterado.
+        Retorna mouth_open, debug_frame, lip_crop_clean (sem anotações)
+        """
+        source = frame.copy() if debug else frame
+        processed_frame, _, mouth_bbox = self.process_frame(source, draw=debug)
+        if mouth_bbox is None:
+            return False, processed_frame, None
+        
+        x1, y1, x2, y2 = mouth_bbox
+        mouth_open = y2 - y1 > self.simple_config['mouth_open_ratio'] * (x2 - x1)
+        
+        # Extrair recorte limpo do frame original (sem anotações)
+        lip_crop_clean = frame[y1:y2, x1:x2]
+        
+        if debug:
+            cv2.rectangle(processed_frame, (x1, y1), (x2, y2), (0, 255, 0) if mouth_open else (0, 0, 255), 2)
+        return mouth_open, processed_frame, lip_crop_clean
+    
+    def _crop_filename(self):
+        """Gera o caminho de saída para um novo recorte"""
+        return self._crop_filename_tmpl.format(next(self._crop_seq), time.monotonic_ns())
+    
     def save_mouth_crop(self, mouth_crop):
-        """Salva o recorte da boca"""
+        """Salva o recorte da boca (a gravação acontece em segundo plano)"""
         if mouth_crop is not None and mouth_crop.size > 0:
-            timestamp = datetime.now().strftime(self.save_config['timestamp_format'])[:-3]
-            filename = f"{self.output_dir}/mouth_crop_{timestamp}.jpg"
+            filename = self._crop_filename()
             
-            # Salvar com qualidade configurada
-            cv2.imwrite(filename, mouth_crop, [cv2.IMWRITE_JPEG_QUALITY, self.save_config['jpeg_quality']])
+            # Limitar recortes pendentes: esperar o mais antigo se a fila estiver cheia
+            if len(self._pending_saves) == self._pending_saves.maxlen:
+                self._pending_saves[0].result()
+            
+            # Salvar com qualidade configurada (o recorte realçado já é um array próprio)
+            self._pending_saves.append(self._io_pool.submit(
+                cv2.imwrite, filename, mouth_crop,
+                [cv2.IMWRITE_JPEG_QUALITY, self.save_config['jpeg_quality']]
+            ))
             return filename
         return None
     
+    def wait_pending_saves(self):
+        """Aguarda a gravação de todos os recortes pendentes"""
+        while self._pending_saves:
+            self._pending_saves.popleft().result()
+    
+    def close(self):
+        """Conclui as gravações pendentes e libera o pool de gravação"""
+        self.wait_pending_saves()
+        self._io_pool.shutdown()
+    
     def run_camera(self):
-        """Executa a detecção em tempo real usando a câmera"""
-        cap = cv2.VideoCapture(0)
+        """Executa a detecção em tempo real usando a câmera
+        
+        A leitura da câmera roda em uma thread separada (FrameReader),
+        sobreposta à detecção e à exibição.
+        """
+        cap = open_camera(self.camera_config)
         
         if not cap.isOpened():
             print("Erro: Não foi possível abrir a câmera")
             return
         
+        reader = FrameReader(cap)
+        
+        # Instruções fixas: rasterizar o texto uma única vez
+        help_overlay = TextOverlay("Pressione 'c' para capturar, 'q' para sair",
+                                   (10, 30), 0.7, (255, 255, 255), 2)
+        
+        # Buffer da janela de preview do recorte (reutilizado a cada frame)
+        mouth_preview = np.empty((80, 150, 3), dtype=np.uint8)
+        
         print("Iniciando detecção simples de boca...")
         print("Pressione 'c' para capturar um recorte da boca")
         print("Pressione 'q' para sair")
         
         while True:
-            ret, frame = cap.read()
-            if not ret:
+            frame = reader.read()
+            if frame is None:
                 print("Erro: Não foi possível ler o frame da câmera")
                 break
             
-            # Espelhar a imagem horizontalmente
-            frame = cv2.flip(frame, 1)
+            # Espelhar a imagem horizontalmente (in-place: o frame lido é próprio deste loop)
+            cv2.flip(frame, 1, dst=frame)
             
             # Processar frame
             processed_frame, mouth_crop, mouth_bbox = self.process_frame(frame)
             
-            # Mostrar instruções na tela
-            cv2.putText(processed_frame, "Pressione 'c' para capturar, 'q' para sair", 
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            # Mostrar instruções na tela (texto pré-renderizado)
+            help_overlay.apply(processed_frame)
             
             # Mostrar frame principal
             cv2.imshow('Simple Mouth Detection', processed_frame)
@@ -149,8 +301,8 @@ class SimpleLipDetector:
             if mouth_crop is not None and mouth_crop.size > 0:
                 # Redimensionar para visualização melhor
                 if mouth_crop.shape[0] > 0 and mouth_crop.shape[1] > 0:
-                    mouth_resized = cv2.resize(mouth_crop, (150, 80))
-                    cv2.imshow('Mouth Crop', mouth_resized)
+                    cv2.resize(mouth_crop, (150, 80), dst=mouth_preview)
+                    cv2.imshow('Mouth Crop', mouth_preview)
             
             # Processar teclas
             key = cv2.waitKey(1) & 0xFF
@@ -166,14 +318,19 @@ class SimpleLipDetector:
                 else:
                     print("Nenhuma boca detectada para capturar")
         
-        # Limpar recursos
+        # Encerrar a leitura, concluir gravações pendentes e limpar recursos
+        reader.stop()
+        self.wait_pending_saves()
         cap.release()
         cv2.destroyAllWindows()
 
 def main():
     """Função principal"""
     detector = SimpleLipDetector()
-    detector.run_camera()
+    try:
+        detector.run_camera()
+    finally:
+        detector.close()
 
 if __name__ == "__main__":
     main()
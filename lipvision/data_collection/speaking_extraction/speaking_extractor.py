@@ -4,8 +4,14 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 import cv2
 import time
+import queue
+import threading
 import numpy as np
+from collections import deque
 from lipvision.data_collection.lip_detector import LipDetector
+from lipvision.data_collection.camera import open_camera
+from lipvision.data_collection.config import get_config
+from lipvision.data_collection.overlay import TextOverlay
 
 
 
@@ -13,22 +19,126 @@ EXTRACTION_DIR = os.path.join(os.path.dirname(__file__), 'extraction')
 os.makedirs(EXTRACTION_DIR, exist_ok=True)
 
 
-# Parâmetros ajustáveis:
-# Distância mínima (em pixels) entre os landmarks centrais dos lábios para considerar a boca aberta
-MOUTH_OPEN_PIXEL_DISTANCE = 3
+# Parâmetros ajustáveis (o limiar de boca aberta de cada detector fica em config.py):
 # Janela de silêncio (em segundos) após fechar a boca para encerrar a gravação
 POST_SILENCE_WINDOW = 0.3
 # Tempo de pre-gravação (em segundos) antes da detecção da abertura da boca
 PRE_DETECTION_BUFFER = 0.15
+# Encoders H.264 do GStreamer testados em ordem (GPU NVIDIA, VA-API, V4L2 M2M, CPU)
+GSTREAMER_ENCODERS = [
+    'nvh264enc',
+    'vaapih264enc',
+    'v4l2h264enc',
+    'x264enc speed-preset=ultrafast tune=zerolatency',
+]
+GSTREAMER_PIPELINE = 'appsrc ! videoconvert ! {encoder} ! h264parse ! mp4mux ! filesink location="{path}"'
+# Fonte e cores da visualização (BGR)
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+OPEN_COLOR = (0, 255, 0)
+CLOSED_COLOR = (0, 0, 255)
+INFO_COLOR = (255, 255, 255)
+COUNTDOWN_COLOR = (255, 255, 0)
+# Tamanho das filas entre captura e inferência (back-pressure: frames excedentes são descartados)
+PIPELINE_QUEUE_SIZE = 2
+# Recortes aguardando o encoder (cheia, a thread principal espera a gravação)
+WRITE_QUEUE_SIZE = 64
+# Espera máxima (s) por um resultado antes de verificar se as threads continuam vivas
+RESULT_TIMEOUT = 1.0
 
 
 # Nova versão: captura da câmera, salva recortes de "fala" em extraction
 
 from lipvision.data_collection.simple_lip_detector import SimpleLipDetector
 
+
+def _has_gstreamer():
+    """Verifica se o OpenCV foi compilado com suporte ao GStreamer"""
+    for line in cv2.getBuildInformation().splitlines():
+        if line.strip().startswith('GStreamer:'):
+            return 'YES' in line
+    return False
+
+
+def _put_until_stopped(q, item, stop_event):
+    """Coloca item na fila, bloqueando enquanto estiver cheia, mas respeitando o sinal de parada"""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class _FramePool:
+    """
+    Buffers de frame reutilizados entre a captura e o loop principal.
+    
+    A captura decodifica direto em um buffer livre (retrieve(image=...)) e o
+    buffer volta ao pool quando o frame é descartado pela captura ou depois
+    que o loop principal copia o recorte da boca. Com o pool esgotado a
+    captura aloca um frame novo.
+    """
+
+    def __init__(self, max_buffers):
+        self._free = queue.SimpleQueue()
+        self._owned = {}
+        self._max_buffers = max_buffers
+
+    def acquire(self, shape):
+        """Retorna um buffer livre com o formato dado, ou None se o pool estiver esgotado"""
+        while True:
+            try:
+                buf = self._free.get_nowait()
+            except queue.Empty:
+                if len(self._owned) >= self._max_buffers:
+                    return None
+                buf = np.empty(shape, dtype=np.uint8)
+                self._owned[id(buf)] = buf
+                return buf
+            if buf.shape == shape:
+                return buf
+            # Resolução mudou: descartar o buffer antigo
+            del self._owned[id(buf)]
+
+    def release(self, buf):
+        """Devolve o buffer ao pool (frames alocados fora do pool são ignorados)"""
+        if self._owned.get(id(buf)) is buf:
+            self._free.put(buf)
+
+
+def _even_size(size):
+    """Arredonda (largura, altura) para baixo para valores pares (mínimo 2)"""
+    w, h = size
+    return (max(2, w - w % 2), max(2, h - h % 2))
+
+
+class _CropWriter:
+    """
+    VideoWriter de recortes da boca com tamanho fixo.
+    
+    Os encoders H.264 rejeitam larguras/alturas ímpares e o tamanho do recorte
+    varia a cada frame, então o vídeo usa dimensões pares e cada recorte com
+    tamanho diferente é redimensionado (em um buffer reutilizado) antes de gravar.
+    """
+
+    def __init__(self, writer, size):
+        self._writer = writer
+        self._size = size
+        self._resized = np.empty((size[1], size[0], 3), dtype=np.uint8)
+
+    def write(self, lip_crop):
+        if (lip_crop.shape[1], lip_crop.shape[0]) != self._size:
+            lip_crop = cv2.resize(lip_crop, self._size, dst=self._resized)
+        self._writer.write(lip_crop)
+
+    def release(self):
+        self._writer.release()
+
+
 class SpeakingExtractor:
     def __init__(self, method='mediapipe', post_silence_window=POST_SILENCE_WINDOW, 
-                 pre_detection_buffer=PRE_DETECTION_BUFFER, camera_index=0, fps=30):
+                 pre_detection_buffer=PRE_DETECTION_BUFFER, camera_index=0, fps=30, headless=False):
         if method == 'mediapipe':
             self.detector = LipDetector()
         elif method == 'simple':
@@ -38,212 +148,352 @@ class SpeakingExtractor:
         self.post_silence_window = post_silence_window
         self.camera_index = camera_index
         self.fps = fps
+        # Sem janelas: nenhuma anotação/visualização é gerada (encerrar com Ctrl+C)
+        self.headless = headless
         
         # Buffer circular para gravar antes da detecção
         self.pre_detection_seconds = pre_detection_buffer
         self.pre_buffer_size = int(self.fps * self.pre_detection_seconds)
-        self.frame_buffer = []  # Buffer circular de frames
-        self.lip_crop_buffer = []  # Buffer circular de recortes da boca
+        # Buffer circular de (instante, recorte da boca); pre_buffer_size limita a memória
+        self.lip_crop_buffer = deque(maxlen=self.pre_buffer_size)
+        
+        # Encoder do GStreamer em uso: None = ainda não testado, False = indisponível (usa mp4v)
+        self._gst_encoder = None if _has_gstreamer() else False
+        
+        # Codec do VideoWriter de fallback (sem GStreamer)
+        self._fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        
+        # Pool de frames da captura (criado em run)
+        self._frame_pool = None
+
+    def _grab_loop(self, cap, frame_q, stop_event):
+        """Thread de captura: lê frames da câmera e descarta os que a inferência não acompanhar
+        
+        Ao terminar sempre envia o sinal de fim (None) ou a exceção que a encerrou.
+        """
+        shape = None
+        end = None
+        try:
+            while not stop_event.is_set():
+                # grab() + retrieve(): com buffer de 1 frame no driver, sempre o frame mais recente
+                ret = cap.grab()
+                if ret:
+                    # Decodificar direto em um buffer livre do pool (sem alocar um frame novo)
+                    buf = self._frame_pool.acquire(shape) if shape is not None else None
+                    ret, frame = cap.retrieve(image=buf) if buf is not None else cap.retrieve()
+                if not ret:
+                    break
+                shape = frame.shape
+                # Espelhar in-place: o frame pertence a este loop até entrar na fila
+                cv2.flip(frame, 1, dst=frame)
+                try:
+                    frame_q.put_nowait(frame)
+                except queue.Full:
+                    self._frame_pool.release(frame)
+        except Exception as e:
+            end = e
+        finally:
+            _put_until_stopped(frame_q, end, stop_event)
+
+    def _inference_loop(self, frame_q, result_q, stop_event):
+        """Thread de inferência: detecta a boca no frame mais recente da captura
+        
+        O sinal de fim e exceções (da captura ou do detector) são repassados
+        para a thread principal pela fila de resultados.
+        """
+        try:
+            while not stop_event.is_set():
+                try:
+                    frame = frame_q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if frame is None or isinstance(frame, Exception):
+                    _put_until_stopped(result_q, frame, stop_event)
+                    break
+                mouth_open, debug_frame, lip_crop = self._is_mouth_open(frame, debug=not self.headless)
+                _put_until_stopped(result_q, (frame, mouth_open, debug_frame, lip_crop), stop_event)
+        except Exception as e:
+            _put_until_stopped(result_q, e, stop_event)
+
+    def _write_loop(self, write_q, write_failed, stop_event, errors):
+        """Thread de gravação: (writer, recorte) grava o recorte, (writer, None) finaliza o vídeo
+        
+        Se a gravação falhar, a exceção é guardada em errors, o pipeline é
+        parado e a fila é esvaziada (quem ainda enviar recortes não fica bloqueado).
+        """
+        try:
+            while True:
+                item = write_q.get()
+                if item is None:
+                    break
+                writer, lip_crop = item
+                if lip_crop is None:
+                    writer.release()
+                else:
+                    writer.write(lip_crop)
+        except Exception as e:
+            errors.append(e)
+            write_failed.set()
+            stop_event.set()
+            while True:
+                try:
+                    write_q.get_nowait()
+                except queue.Empty:
+                    break
 
     def run(self):
-        cap = cv2.VideoCapture(self.camera_index)
+        """Extrai segmentos de fala da câmera
+        
+        Captura, inferência e gravação do vídeo rodam em threads separadas; a
+        thread principal executa apenas a máquina de estados e a interface
+        (cv2.imshow precisa ficar na thread principal).
+        """
+        camera_config = dict(get_config('camera'), camera_index=self.camera_index, fps=self.fps)
+        cap = open_camera(camera_config)
         if not cap.isOpened():
             print("Erro: Não foi possível abrir a câmera")
             return
 
-        print("Iniciando extração de segmentos de fala (pressione 'q' para sair)")
+        quit_hint = "Ctrl+C" if self.headless else "'q'"
+        print(f"Iniciando extração de segmentos de fala (pressione {quit_hint} para sair)")
         print(f"Pre-buffer: {self.pre_detection_seconds}s ({self.pre_buffer_size} frames)")
         
+        # Frames vivos ao mesmo tempo: filas + um por estágio
+        self._frame_pool = _FramePool(2 * PIPELINE_QUEUE_SIZE + 3)
+        
+        stop_event = threading.Event()
+        frame_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        result_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        write_q = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        workers = [
+            threading.Thread(target=self._grab_loop, args=(cap, frame_q, stop_event), daemon=True),
+            threading.Thread(target=self._inference_loop, args=(frame_q, result_q, stop_event), daemon=True),
+        ]
+        # Falha da gravação: as escritas na fila usam este sinal para nunca bloquear
+        write_failed = threading.Event()
+        write_errors = []
+        write_worker = threading.Thread(target=self._write_loop,
+                                        args=(write_q, write_failed, stop_event, write_errors), daemon=True)
+        for worker in workers + [write_worker]:
+            worker.start()
+        
         speaking = False
-        post_silence_counter = 0
-        silence_frames = int(self.post_silence_window * self.fps)
+        # Instante (perf_counter) da última boca aberta: o silêncio é medido em
+        # tempo real, independente do FPS efetivo do loop
+        last_open_ts = None
         segment_id = 1
         writer = None
         current_output_path = None
+        
+        # Buffer da janela do recorte da boca (reutilizado a cada frame)
+        lip_display = np.empty((150, 300, 3), dtype=np.uint8)
+        
+        # Textos fixos da visualização: rasterizados uma única vez
+        pre_buffer_overlay = TextOverlay(f"Pre-buffer: {self.pre_detection_seconds}s", (10, 80), 0.6, INFO_COLOR, 2)
+        clean_overlay = TextOverlay("Gravando: recortes limpos (sem pontos)", (10, 100), 0.6, INFO_COLOR, 2)
+        recording_overlay = TextOverlay("GRAVANDO (LIMPO)", (10, 50), 0.5, OPEN_COLOR, 2)
+        no_points_overlay = TextOverlay("Sem pontos MediaPipe", (10, 140), 0.4, INFO_COLOR, 1)
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("Erro ao capturar frame da câmera")
-                break
-            
-            frame = cv2.flip(frame, 1)
-            
-            # Detectar se a boca está aberta e obter recorte
-            mouth_open, debug_frame, lip_crop = self._is_mouth_open(frame, debug=True)
-            
-            # Sempre adicionar frame e recorte ao buffer circular
-            self.add_frame_to_buffer(frame, lip_crop)
-
-            if mouth_open and not speaking:
-                # Começou a falar - iniciar gravação COM pre-buffer
-                speaking = True
-                post_silence_counter = 0
-                writer, current_output_path = self.start_recording_with_prebuffer(segment_id)
-
-            if speaking:
-                if writer is not None and lip_crop is not None and lip_crop.size > 0:
-                    writer.write(lip_crop)  # Gravar apenas o recorte da boca
-
-                if not mouth_open:
-                    post_silence_counter += 1
-                    if post_silence_counter >= silence_frames:
+        # Exceção de uma thread de trabalho, relançada depois da limpeza
+        error = None
+
+        try:
+            while not write_failed.is_set():
+                try:
+                    result = result_q.get(timeout=RESULT_TIMEOUT)
+                except queue.Empty:
+                    if all(worker.is_alive() for worker in workers):
+                        continue
+                    # Uma thread terminou: esperar o sinal de fim que ainda pode estar a caminho
+                    try:
+                        result = result_q.get(timeout=RESULT_TIMEOUT)
+                    except queue.Empty:
+                        error = RuntimeError("Thread de captura/inferência encerrada sem sinal de fim")
+                        break
+                if isinstance(result, Exception):
+                    error = result
+                    break
+                if result is None:
+                    print("Erro ao capturar frame da câmera")
+                    break
+                frame, mouth_open, debug_frame, lip_crop = result
+                now = time.perf_counter()
+                
+                # Sempre adicionar o recorte ao buffer circular, copiado para fora
+                # do frame (pequeno), que volta ao pool da captura
+                if lip_crop is not None and lip_crop.size > 0:
+                    lip_crop = lip_crop.copy()
+                else:
+                    lip_crop = None
+                self._frame_pool.release(frame)
+                self.add_crop_to_buffer(lip_crop, now)
+
+                if mouth_open and not speaking:
+                    # Começou a falar - iniciar gravação COM pre-buffer
+                    speaking = True
+                    writer, current_output_path = self.start_recording_with_prebuffer(
+                        segment_id, write_q, write_failed)
+
+                if speaking:
+                    if lip_crop is not None:
+                        if writer is None:
+                            # Pre-buffer sem recortes: abrir o writer com o primeiro recorte real
+                            h, w = lip_crop.shape[:2]
+                            writer = self._open_writer(current_output_path, (w, h))
+                        # Gravar apenas o recorte da boca
+                        _put_until_stopped(write_q, (writer, lip_crop), write_failed)
+
+                    if mouth_open:
+                        last_open_ts = now
+                    elif now - last_open_ts >= self.post_silence_window:
                         # Parou de falar - finalizar gravação
                         speaking = False
-                        post_silence_counter = 0
                         if writer is not None:
-                            writer.release()
+                            _put_until_stopped(write_q, (writer, None), write_failed)
                             writer = None
                         print(f"💾 Segmento de boca limpo salvo: {current_output_path}")
                         segment_id += 1
-                else:
-                    post_silence_counter = 0
-
-            # Mostrar visualização
-            status = "FALANDO" if speaking else "SILENCIO"
-            color = (0, 255, 0) if mouth_open else (0, 0, 255)
-            cv2.putText(debug_frame, f"{status}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
-            cv2.putText(debug_frame, f"Buffer: {len(self.frame_buffer)}/{self.pre_buffer_size} frames", 
-                       (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            cv2.putText(debug_frame, f"Pre-buffer: {self.pre_detection_seconds}s", 
-                       (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            cv2.putText(debug_frame, f"Gravando: recortes limpos (sem pontos)", 
-                       (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            
-            if speaking and post_silence_counter > 0:
-                remaining_frames = silence_frames - post_silence_counter
-                cv2.putText(debug_frame, f"Encerrando em: {remaining_frames} frames", 
-                           (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-
-            cv2.imshow('Speaking Extraction - Face', debug_frame)
-            
-            # Mostrar recorte da boca em janela separada (LIMPO, sem pontos MediaPipe)
-            if lip_crop is not None and lip_crop.size > 0:
-                # Redimensionar para visualização melhor
-                if lip_crop.shape[0] > 0 and lip_crop.shape[1] > 0:
-                    lip_resized = cv2.resize(lip_crop, (300, 150))  # Tamanho maior para melhor visualização
-                    
-                    # Adicionar informações no recorte
-                    lip_display = lip_resized.copy()
-                    cv2.putText(lip_display, status, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-                    if speaking:
-                        cv2.putText(lip_display, "GRAVANDO (LIMPO)", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-                    cv2.putText(lip_display, "Sem pontos MediaPipe", (10, 140), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
-                    
-                    cv2.imshow('Speaking Extraction - Lip Crop (Clean)', lip_display)
-
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-
-        # Cleanup
+
+                if self.headless:
+                    continue
+
+                # Mostrar visualização
+                status = "FALANDO" if speaking else "SILENCIO"
+                color = OPEN_COLOR if mouth_open else CLOSED_COLOR
+                cv2.putText(debug_frame, status, (10, 30), FONT, 0.8, color, 2)
+                cv2.putText(debug_frame, f"Buffer: {len(self.lip_crop_buffer)}/{self.pre_buffer_size} frames", 
+                           (10, 60), FONT, 0.6, INFO_COLOR, 2)
+                pre_buffer_overlay.apply(debug_frame)
+                clean_overlay.apply(debug_frame)
+                
+                if speaking and not mouth_open:
+                    remaining = self.post_silence_window - (now - last_open_ts)
+                    cv2.putText(debug_frame, f"Encerrando em: {remaining:.2f}s", 
+                               (10, 120), FONT, 0.6, COUNTDOWN_COLOR, 2)
+
+                cv2.imshow('Speaking Extraction - Face', debug_frame)
+                
+                # Mostrar recorte da boca em janela separada (LIMPO, sem pontos MediaPipe)
+                if lip_crop is not None and lip_crop.size > 0:
+                    # Redimensionar para visualização melhor
+                    if lip_crop.shape[0] > 0 and lip_crop.shape[1] > 0:
+                        # Tamanho maior para melhor visualização (no buffer reutilizado entre frames)
+                        cv2.resize(lip_crop, (300, 150), dst=lip_display)
+                        
+                        # Adicionar informações no recorte
+                        cv2.putText(lip_display, status, (10, 25), FONT, 0.7, color, 2)
+                        if speaking:
+                            recording_overlay.apply(lip_display)
+                        no_points_overlay.apply(lip_display)
+                        
+                        cv2.imshow('Speaking Extraction - Lip Crop (Clean)', lip_display)
+
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+        except KeyboardInterrupt:
+            pass
+
+        # Cleanup: parar captura/inferência e concluir a gravação pendente
+        stop_event.set()
+        for worker in workers:
+            worker.join()
         if writer is not None:
-            writer.release()
+            _put_until_stopped(write_q, (writer, None), write_failed)
+        _put_until_stopped(write_q, None, write_failed)
+        write_worker.join()
         cap.release()
-        cv2.destroyAllWindows()
+        self._frame_pool = None
+        if not self.headless:
+            cv2.destroyAllWindows()
         print(f"Extração finalizada. {segment_id-1} segmentos salvos.")
+        if write_errors:
+            # Falha da gravação é a causa: as demais threads apenas pararam por ela
+            error = write_errors[0]
+        if error is not None:
+            raise error
+
+    def close(self):
+        """Libera os recursos do detector (Face Mesh compartilhado, gravações pendentes)"""
+        self.detector.close()
 
     def _is_mouth_open(self, frame, debug=False):
         """
-        Detecta se a boca está aberta usando o LipDetector.
+        Detecta se a boca está aberta usando o detector configurado.
         Retorna mouth_open, debug_frame, lip_crop_clean (sem pontos do MediaPipe)
         """
-        if isinstance(self.detector, LipDetector):
-            # Processar frame para detectar landmarks
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.detector.face_mesh.process(rgb_frame)
-            
-            debug_frame = frame.copy() if debug else frame
-            mouth_open = False
-            lip_crop_clean = None
-            
-            if results.multi_face_landmarks:
-                for face_landmarks in results.multi_face_landmarks:
-                    h, w, _ = frame.shape
-                    
-                    # Calcular se a boca está aberta usando os landmarks centrais
-                    upper_idx = 13
-                    lower_idx = 14
-                    upper = face_landmarks.landmark[upper_idx]
-                    lower = face_landmarks.landmark[lower_idx]
-                    upper_y = int(upper.y * h)
-                    lower_y = int(lower.y * h)
-                    mouth_distance = abs(lower_y - upper_y)
-                    mouth_open = mouth_distance > MOUTH_OPEN_PIXEL_DISTANCE
-                    
-                    # Extrair recorte da boca do FRAME ORIGINAL (sem pontos)
-                    lip_landmarks = self.detector.get_lip_landmarks(face_landmarks.landmark, h, w)
-                    lip_crop_clean, bbox = self.detector.crop_lip_region(frame.copy(), lip_landmarks)
-                    
-                    # Para debug, desenhar landmarks apenas no debug_frame
-                    if debug:
-                        debug_frame = self.detector.draw_lip_landmarks(debug_frame, lip_landmarks, face_landmarks.landmark, h, w)
-                        if bbox:
-                            cv2.rectangle(debug_frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), (0, 255, 255), 2)
-                            cv2.putText(debug_frame, "Lips", (bbox[0], bbox[1]-10), 
-                                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-                    break
-                
-                return mouth_open, debug_frame, lip_crop_clean
-            else:
-                return False, debug_frame, None
-                
-        elif isinstance(self.detector, SimpleLipDetector):
-            processed_frame, mouth_crop, mouth_bbox = self.detector.process_frame(frame.copy())
-            if mouth_bbox is not None:
-                x1, y1, x2, y2 = mouth_bbox
-                height = y2 - y1
-                width = x2 - x1
-                mouth_open = height > 0.20 * width
-                
-                # Extrair recorte limpo do frame original (sem anotações)
-                lip_crop_clean = frame[y1:y2, x1:x2].copy()
-                
-                if debug:
-                    cv2.rectangle(processed_frame, (x1, y1), (x2, y2), (0,255,0) if mouth_open else (0,0,255), 2)
-                    return mouth_open, processed_frame, lip_crop_clean
-                return mouth_open, frame, lip_crop_clean
-            return False, processed_frame if debug else frame, None
-        else:
-            raise RuntimeError("Detector desconhecido para detecção de boca aberta")
+        return self.detector.detect_mouth(frame, debug=debug)
 
-    def add_frame_to_buffer(self, frame, lip_crop):
-        """Adiciona frame e recorte da boca ao buffer circular"""
-        self.frame_buffer.append(frame.copy())
-        if lip_crop is not None and lip_crop.size > 0:
-            self.lip_crop_buffer.append(lip_crop.copy())
-        else:
-            # Se não há recorte, adicionar um frame vazio do tamanho padrão
-            self.lip_crop_buffer.append(np.zeros((100, 200, 3), dtype=np.uint8))
+    def add_crop_to_buffer(self, lip_crop, timestamp=None):
+        """Adiciona o recorte da boca ao buffer circular
         
-        if len(self.frame_buffer) > self.pre_buffer_size:
-            self.frame_buffer.pop(0)  # Remove o frame mais antigo
-        if len(self.lip_crop_buffer) > self.pre_buffer_size:
-            self.lip_crop_buffer.pop(0)  # Remove o recorte mais antigo
+        Recortes mais antigos que pre_detection_seconds são descartados (o deque
+        também descarta o mais antigo ao atingir pre_buffer_size).
+        Apenas os recortes são guardados: os frames completos nunca são gravados.
+        Frames sem recorte entram como None e são ignorados na gravação.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        buffer = self.lip_crop_buffer
+        while buffer and timestamp - buffer[0][0] > self.pre_detection_seconds:
+            buffer.popleft()
+        buffer.append((timestamp, lip_crop if lip_crop is not None and lip_crop.size > 0 else None))
+
+    def _open_writer(self, output_path, size):
+        """Abre o VideoWriter: H.264 acelerado via GStreamer quando disponível, senão mp4v
+        
+        O tamanho é arredondado para valores pares e os recortes são ajustados a ele.
+        """
+        size = _even_size(size)
+        encoders = GSTREAMER_ENCODERS if self._gst_encoder is None else [self._gst_encoder]
+        if self._gst_encoder is not False:
+            for encoder in encoders:
+                pipeline = GSTREAMER_PIPELINE.format(encoder=encoder, path=output_path)
+                writer = cv2.VideoWriter(pipeline, cv2.CAP_GSTREAMER, 0, self.fps, size)
+                if writer.isOpened():
+                    self._gst_encoder = encoder
+                    return _CropWriter(writer, size)
+            # Nenhum encoder disponível: não tentar de novo nos próximos segmentos
+            self._gst_encoder = False
+        
+        return _CropWriter(cv2.VideoWriter(output_path, self._fourcc, self.fps, size), size)
 
-    def start_recording_with_prebuffer(self, segment_id):
-        """Inicia gravação incluindo recortes da boca do buffer"""
+    def start_recording_with_prebuffer(self, segment_id, write_queue=None, write_failed=None):
+        """Inicia gravação incluindo recortes da boca do buffer
+        
+        Com write_queue, os recortes do buffer são enviados à thread de
+        gravação em vez de escritos diretamente (sem bloquear depois que
+        write_failed for sinalizado). Sem nenhum recorte no buffer
+        o writer retornado é None e deve ser aberto com o primeiro recorte real.
+        """
         timestamp = time.strftime('%Y%m%d_%H%M%S')
         output_path = os.path.join(EXTRACTION_DIR, f'lip_segment_{segment_id}_{timestamp}.mp4')
         
-        # Obter dimensões do recorte da boca
-        if self.lip_crop_buffer:
-            h, w = self.lip_crop_buffer[0].shape[:2]
-        else:
-            h, w = 100, 200  # Fallback para recorte da boca
+        crops = [lip_crop for _, lip_crop in self.lip_crop_buffer if lip_crop is not None]
+        if not crops:
+            print("🟢 Iniciando gravação de recortes limpos da boca sem pre-buffer")
+            return None, output_path
         
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        writer = cv2.VideoWriter(output_path, fourcc, self.fps, (w, h))
+        # Dimensões do vídeo a partir do primeiro recorte da boca
+        h, w = crops[0].shape[:2]
+        writer = self._open_writer(output_path, (w, h))
         
         # Escrever recortes da boca do buffer (0.15s antes da detecção)
-        for lip_crop in self.lip_crop_buffer:
-            if lip_crop is not None and lip_crop.size > 0:
+        for lip_crop in crops:
+            if write_queue is None:
                 writer.write(lip_crop)
+            elif write_failed is None:
+                write_queue.put((writer, lip_crop))
+            else:
+                _put_until_stopped(write_queue, (writer, lip_crop), write_failed)
         
-        print(f"🟢 Iniciando gravação de recortes limpos da boca com {len(self.lip_crop_buffer)} frames de pre-buffer ({self.pre_detection_seconds}s)")
+        print(f"🟢 Iniciando gravação de recortes limpos da boca com {len(crops)} frames de pre-buffer ({self.pre_detection_seconds}s)")
         return writer, output_path
 
 
 if __name__ == '__main__':
-    extractor = SpeakingExtractor()
-    extractor.run()
+    extractor = SpeakingExtractor(headless='--headless' in sys.argv)
+    try:
+        extractor.run()
+    finally:
+        extractor.close()
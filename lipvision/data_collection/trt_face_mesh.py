@@ -0,0 +1,138 @@
+"""
+Face Mesh em TensorRT (FP16) para máquinas com GPU CUDA
+
+O modelo de landmarks do MediaPipe é convertido para ONNX (tf2onnx) e
+compilado em um engine TensorRT FP16 (trtexec). A inferência usa buffers
+de host paginados (pinned), cópias assíncronas e uma stream CUDA dedicada.
+
+Gerar o engine:
+    python -m lipvision.data_collection.trt_face_mesh face_landmark.tflite face_landmark_fp16.plan
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+
+from .quantized_face_mesh import NUM_FACE_LANDMARKS, TrackingFaceMesh
+
+
+def has_cuda_device():
+    """Verifica se TensorRT/PyCUDA estão instalados e há uma GPU CUDA disponível"""
+    try:
+        import tensorrt  # noqa: F401
+        import pycuda.driver as cuda
+        cuda.init()
+        return cuda.Device.count() > 0
+    except Exception:
+        return False
+
+
+def build_engine(tflite_path, engine_path):
+    """Converte o .tflite para ONNX e compila um engine TensorRT FP16"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        onnx_path = os.path.join(tmp_dir, 'face_landmark.onnx')
+        subprocess.run([sys.executable, '-m', 'tf2onnx.convert',
+                        '--tflite', tflite_path, '--output', onnx_path], check=True)
+        subprocess.run(['trtexec', f'--onnx={onnx_path}', '--fp16',
+                        f'--saveEngine={engine_path}'], check=True)
+    return engine_path
+
+
+class TRTFaceMesh(TrackingFaceMesh):
+    def __init__(self, engine_path, fallback, min_tracking_confidence=0.5):
+        """
+        Args:
+            engine_path (str): Caminho do engine TensorRT (.plan)
+            fallback: FaceMesh do MediaPipe usado para (re)detectar a face
+            min_tracking_confidence (float): Confiança mínima para manter o rastreamento
+        """
+        import tensorrt as trt
+        import pycuda.driver as cuda
+
+        # Contexto primário da GPU mantido pelo objeto: process() pode ser chamado de
+        # outra thread (ex.: inferência do SpeakingExtractor), onde nenhum contexto
+        # está ativo, então ele é empilhado explicitamente em cada uso
+        cuda.init()
+        self._cuda = cuda
+        self._cuda_ctx = cuda.Device(0).retain_primary_context()
+        self._cuda_ctx.push()
+        try:
+            self._create_engine(trt, engine_path)
+        finally:
+            self._cuda_ctx.pop()
+
+        _, input_h, input_w, _ = self._host[self._input_name].shape
+        super().__init__(fallback, (int(input_w), int(input_h)), min_tracking_confidence)
+
+    def _create_engine(self, trt, engine_path):
+        """Carrega o engine e aloca os buffers de E/S (com o contexto CUDA ativo)"""
+        cuda = self._cuda
+        logger = trt.Logger(trt.Logger.WARNING)
+        with open(engine_path, 'rb') as f:
+            self.engine = trt.Runtime(logger).deserialize_cuda_engine(f.read())
+        self.context = self.engine.create_execution_context()
+        self.stream = cuda.Stream()
+
+        # Alocar buffers pinned no host e buffers no device para cada tensor de E/S
+        self._input_name = None
+        self._host = {}
+        self._device = {}
+        for i in range(self.engine.num_io_tensors):
+            name = self.engine.get_tensor_name(i)
+            shape = tuple(self.engine.get_tensor_shape(name))
+            dtype = trt.nptype(self.engine.get_tensor_dtype(name))
+            self._host[name] = cuda.pagelocked_empty(shape, dtype)
+            self._device[name] = cuda.mem_alloc(self._host[name].nbytes)
+            self.context.set_tensor_address(name, int(self._device[name]))
+            if self.engine.get_tensor_mode(name) == trt.TensorIOMode.INPUT:
+                self._input_name = name
+
+        # Identificar as saídas pelo tamanho: landmarks (468*3) e presença da face (1)
+        self._landmarks_name = None
+        self._flag_name = None
+        for name, buf in self._host.items():
+            if name == self._input_name:
+                continue
+            if buf.size == NUM_FACE_LANDMARKS * 3 and self._landmarks_name is None:
+                self._landmarks_name = name
+            elif buf.size == 1 and self._flag_name is None:
+                self._flag_name = name
+        if self._landmarks_name is None:
+            raise ValueError(f"Engine sem saída de {NUM_FACE_LANDMARKS} landmarks: {engine_path}")
+
+    def _infer(self, crop):
+        """Copia o recorte para a GPU, executa o engine e traz as saídas de volta"""
+        cuda = self._cuda
+        input_buf = self._host[self._input_name]
+        np.multiply(crop[np.newaxis], 1.0 / 255.0, out=input_buf, casting='unsafe')
+
+        self._cuda_ctx.push()
+        try:
+            cuda.memcpy_htod_async(self._device[self._input_name], input_buf, self.stream)
+            self.context.execute_async_v3(stream_handle=self.stream.handle)
+            for name in (self._landmarks_name, self._flag_name):
+                if name is not None:
+                    cuda.memcpy_dtoh_async(self._host[name], self._device[name], self.stream)
+            self.stream.synchronize()
+        finally:
+            self._cuda_ctx.pop()
+
+        flag = None
+        if self._flag_name is not None:
+            flag = float(self._host[self._flag_name].reshape(-1)[0])
+        return self._host[self._landmarks_name].astype(np.float32), flag
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    build_engine(sys.argv[1], sys.argv[2])
+    print(f"✅ Engine TensorRT FP16 salvo: {sys.argv[2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,22 +16,23 @@ def main():
     simple_detector = SimpleLipDetector()
 
     print("Pressione 'q' para sair.")
+    frame_count = 0
     while True:
         ret, frame = cap.read()
         if not ret:
             print("Erro ao capturar frame da câmera")
             break
-        frame = cv2.flip(frame, 1)
-
-        # MediaPipe
-        mp_frame = frame.copy()
-        mp_processed, mp_crop, _ = mediapipe_detector.process_frame(mp_frame)
-        cv2.imshow('Lip Reading (MediaPipe)', mp_processed)
-
-        # Simple
-        simple_frame = frame.copy()
-        simple_processed, simple_crop, _ = simple_detector.process_frame(simple_frame)
-        cv2.imshow('Simple Detector (Haar)', simple_processed)
+        cv2.flip(frame, 1, dst=frame)
+
+        # Detectores alternados: um por frame (cada janela atualiza a cada 2 frames).
+        # Cada frame é desenhado por um único detector, então não precisa de cópia
+        if frame_count % 2 == 0:
+            mp_processed, mp_crop, _ = mediapipe_detector.process_frame(frame)
+            cv2.imshow('Lip Reading (MediaPipe)', mp_processed)
+        else:
+            simple_processed, simple_crop, _ = simple_detector.process_frame(frame)
+            cv2.imshow('Simple Detector (Haar)', simple_processed)
+        frame_count += 1
 
         # Sair
         key = cv2.waitKey(1) & 0xFF
@@ -39,6 +40,8 @@ def main():
             break
 
     cap.release()
+    mediapipe_detector.close()
+    simple_detector.close()
     cv2.destroyAllWindows()
 
 if __name__ == "__main__":
@@ -19,12 +19,15 @@ import cv2
 import numpy as np
 import time
 from lipvision.data_collection.lip_detector import LipDetector
+from lipvision.data_collection.camera import FrameReader
 
 # Parâmetros ajustáveis para 3D Saliency
 SALIENCY_THRESHOLD = 30  # Threshold para considerar região saliente
 MOUTH_REGION_RATIO = 0.4  # Proporção da face que corresponde à região da boca
 FRAME_BUFFER_SIZE = 3  # Número de frames para análise temporal
+MOUTH_CROP_SIZE = (64, 32)  # Tamanho (largura, altura) dos recortes da boca no buffer
 MOUTH_OPEN_SALIENCY_MIN = 0.15  # Saliência mínima na região da boca para considerar aberta
+SALIENCY_EVERY = 2  # Calcular a saliência a cada N frames (nos demais reutiliza o último resultado)
 
 # Parâmetros de intensidade da saliência (ajustáveis em tempo real)
 TEMPORAL_SALIENCY_WEIGHT = 0.7  # Peso da saliência temporal (0.0 a 1.0)
@@ -32,41 +35,75 @@ STATIC_SALIENCY_WEIGHT = 0.3    # Peso da saliência estática (0.0 a 1.0)
 SALIENCY_AMPLIFICATION = 1.0    # Multiplicador de amplificação da saliência
 GAUSSIAN_BLUR_SIZE = 5          # Tamanho do filtro Gaussiano para suavização
 
+# Colormaps como LUTs de 256 cores (calculadas uma única vez)
+_GRAY_RAMP = np.arange(256, dtype=np.uint8).reshape(256, 1)
+HOT_LUT = cv2.applyColorMap(_GRAY_RAMP, cv2.COLORMAP_HOT)
+JET_LUT = cv2.applyColorMap(_GRAY_RAMP, cv2.COLORMAP_JET)
+VIRIDIS_LUT = cv2.applyColorMap(_GRAY_RAMP, cv2.COLORMAP_VIRIDIS)
+COOL_LUT = cv2.applyColorMap(_GRAY_RAMP, cv2.COLORMAP_COOL)
+RAINBOW_LUT = cv2.applyColorMap(_GRAY_RAMP, cv2.COLORMAP_RAINBOW)
+
+# Canvas da janela básica da boca (altura, largura), reutilizado entre frames
+MOUTH_VIZ_SIZE = (300, 400)
+_mouth_viz_canvas = None
+# Canvas da janela avançada (grid 2x3 + área de texto), também reutilizado
+_advanced_viz_canvas = None
+
 class SaliencyMouthDetector:
     def __init__(self):
         """Inicializa o detector de boca usando 3D Saliency"""
         self.lip_detector = LipDetector()
-        self.frame_buffer = []
+        # Buffer circular dos recortes da boca em escala de cinza: preallocado e indexado por cursor
+        self.frame_buffer = np.empty((FRAME_BUFFER_SIZE, MOUTH_CROP_SIZE[1], MOUTH_CROP_SIZE[0]), dtype=np.uint8)
+        self._resized_crop = np.empty((MOUTH_CROP_SIZE[1], MOUTH_CROP_SIZE[0], 3), dtype=np.uint8)
+        # Diferenças absolutas (uint8) entre o frame atual e cada recorte do buffer
+        self._diffs = np.empty_like(self.frame_buffer)
+        self._head = 0   # Próxima posição a ser escrita (= recorte mais antigo quando cheio)
+        self._count = 0  # Recortes válidos no buffer
+        # Último resultado da saliência (mapa, razão média, máximo), reutilizado entre cálculos
+        self._frame_idx = 0
+        self._cached_saliency = None
         self.saliency = cv2.saliency.StaticSaliencySpectralResidual_create()
-        
-    def compute_3d_saliency(self, current_frame):
+        # Pesos temporais inteiros (mais recentes pesam mais); a normalização
+        # (peso / N, média dos N frames) é aplicada uma única vez na combinação
+        self._weights = np.arange(1, FRAME_BUFFER_SIZE + 1, dtype=np.uint16)
+        self._temporal_scale = 1.0 / (FRAME_BUFFER_SIZE * FRAME_BUFFER_SIZE)
+        # Buffers da combinação e do mapa final (criados no primeiro frame de cada tamanho)
+        self._combined = None
+        self._saliency_map = None
+        
+    def reset_buffer(self):
+        """Esvazia o buffer de recortes (as posições antigas são apenas sobrescritas)"""
+        self._head = 0
+        self._count = 0
+        self._cached_saliency = None
+    
+    def _push_crop(self, crop):
+        """Redimensiona o recorte e o grava em cinza na próxima posição do buffer circular (retorna a posição)"""
+        slot = self.frame_buffer[self._head]
+        cv2.resize(crop, MOUTH_CROP_SIZE, dst=self._resized_crop)
+        cv2.cvtColor(self._resized_crop, cv2.COLOR_BGR2GRAY, dst=slot)
+        self._head = (self._head + 1) % FRAME_BUFFER_SIZE
+        self._count = min(self._count + 1, FRAME_BUFFER_SIZE)
+        return slot
+    
+    def compute_3d_saliency(self, current_gray):
         """
         Computa 3D Saliency considerando mudanças temporais entre frames.
-        Retorna mapa de saliência que destaca regiões com movimento/mudança.
+        O frame atual e o buffer já estão em escala de cinza (convertidos uma única vez).
+        Retorna mapa de saliência que destaca regiões com movimento/mudança
+        (buffer reutilizado: válido até a próxima chamada).
         """
-        if len(self.frame_buffer) < FRAME_BUFFER_SIZE:
+        if self._count < FRAME_BUFFER_SIZE:
             # Ainda não temos frames suficientes
             return None
             
-        # Converter frames para escala de cinza
-        gray_frames = []
-        for frame in self.frame_buffer:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            gray_frames.append(gray)
-        
-        current_gray = cv2.cvtColor(current_frame, cv2.COLOR_BGR2GRAY)
-        
-        # Calcular diferenças temporais
-        temporal_diff = np.zeros_like(current_gray, dtype=np.float32)
-        
-        for i, prev_frame in enumerate(gray_frames):
-            # Peso maior para frames mais recentes
-            weight = (i + 1) / len(gray_frames)
-            diff = cv2.absdiff(current_gray, prev_frame).astype(np.float32)
-            temporal_diff += weight * diff
-        
-        # Normalizar
-        temporal_diff = temporal_diff / len(gray_frames)
+        # Diferenças temporais em uint8 e soma ponderada inteira (uint16, máx. 255 * 6 com N=3)
+        # em uma única redução (pesos rotacionados para a ordem das posições do buffer circular)
+        for slot, diff in zip(self.frame_buffer, self._diffs):
+            cv2.absdiff(slot, current_gray, dst=diff)
+        temporal_diff = np.tensordot(np.roll(self._weights, self._head), self._diffs, axes=1)
+        temporal_diff = temporal_diff.astype(np.float32)
         
         # Aplicar filtro Gaussiano para suavizar (tamanho ajustável)
         blur_size = max(1, int(GAUSSIAN_BLUR_SIZE))
@@ -74,34 +111,36 @@ class SaliencyMouthDetector:
             blur_size += 1
         temporal_diff = cv2.GaussianBlur(temporal_diff, (blur_size, blur_size), 0)
         
-        # Combinar com saliência estática usando pesos ajustáveis
+        if self._combined is None or self._combined.shape != current_gray.shape:
+            self._combined = np.empty(current_gray.shape, dtype=np.float32)
+            self._saliency_map = np.empty(current_gray.shape, dtype=np.uint8)
+        
+        # Combinar com saliência estática usando pesos ajustáveis (a normalização temporal,
+        # a amplificação e a escala 0-1 -> 0-255 da saliência estática entram direto nos pesos)
+        temporal_weight = self._temporal_scale * SALIENCY_AMPLIFICATION
         success, static_saliency = self.saliency.computeSaliency(current_gray)
         if success:
-            static_saliency = (static_saliency * 255).astype(np.uint8)
-            # Combinar saliência temporal e estática com pesos ajustáveis
-            combined_saliency = (TEMPORAL_SALIENCY_WEIGHT * temporal_diff + 
-                               STATIC_SALIENCY_WEIGHT * static_saliency.astype(np.float32))
+            cv2.addWeighted(temporal_diff, TEMPORAL_SALIENCY_WEIGHT * temporal_weight,
+                            static_saliency, STATIC_SALIENCY_WEIGHT * 255.0 * SALIENCY_AMPLIFICATION,
+                            0.0, dst=self._combined, dtype=cv2.CV_32F)
         else:
-            combined_saliency = temporal_diff
-        
-        # Aplicar amplificação da saliência
-        combined_saliency = combined_saliency * SALIENCY_AMPLIFICATION
+            np.multiply(temporal_diff, temporal_weight, out=self._combined)
         
-        # Normalizar para 0-255
-        combined_saliency = cv2.normalize(combined_saliency, None, 0, 255, cv2.NORM_MINMAX)
-        return combined_saliency.astype(np.uint8)
+        # Normalizar para 0-255 já convertendo para uint8
+        cv2.normalize(self._combined, self._saliency_map, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
+        return self._saliency_map
     
     def compute_mouth_crop_saliency(self, mouth_crop):
         """
         Computa 3D saliency especificamente para o recorte da boca.
         
         Args:
-            mouth_crop: Recorte da região da boca (numpy array)
+            mouth_crop: Recorte da região da boca em escala de cinza (numpy array)
             
         Returns:
             Mapa de saliência do recorte da boca ou None se insuficientes frames
         """
-        if len(self.frame_buffer) < 2:
+        if self._count < 2:
             return None
             
         # Usar o método existente de compute_3d_saliency mas apenas no recorte
@@ -118,43 +157,40 @@ class SaliencyMouthDetector:
         4. Computa 3D Saliency apenas no recorte da boca limpo
         5. Boca aberta = alta saliência no recorte da boca
         """
-        # Manter uma cópia limpa do frame original (sem anotações MediaPipe)
-        clean_frame = frame.copy()
-        
-        # Detectar região da boca usando MediaPipe (isso gerará as anotações no processed_frame)
-        processed_frame, lip_crop, bbox = self.lip_detector.process_frame(frame.copy())
-        
-        if bbox is None or lip_crop is None or lip_crop.size == 0:
-            return False, frame if debug else frame
+        # Detectar região da boca usando MediaPipe sem desenhar: o frame continua limpo
+        # e o recorte é uma view dele (sem cópias do frame inteiro)
+        _, clean_lip_crop, bbox = self.lip_detector.process_frame(frame, draw=False)
         
-        # Extrair recorte da boca do frame LIMPO (sem anotações MediaPipe)
-        x1, y1, x2, y2 = bbox
-        clean_lip_crop = clean_frame[y1:y2, x1:x2]
+        if bbox is None or clean_lip_crop is None or clean_lip_crop.size == 0:
+            return False, frame
         
-        # Redimensionar recorte da boca limpo para tamanho consistente
-        mouth_crop_resized = cv2.resize(clean_lip_crop, (64, 32))
+        # Redimensionar recorte da boca limpo para tamanho consistente, já em cinza no buffer circular
+        mouth_crop_resized = self._push_crop(clean_lip_crop)
         
-        # Atualizar buffer de recortes da boca
-        if len(self.frame_buffer) >= FRAME_BUFFER_SIZE:
-            self.frame_buffer.pop(0)
-        self.frame_buffer.append(mouth_crop_resized.copy())
-        
-        # Computar 3D Saliency apenas no recorte da boca
-        mouth_saliency_map = self.compute_mouth_crop_saliency(mouth_crop_resized)
-        
-        if mouth_saliency_map is None:
-            return False, frame if debug else frame
-        
-        # Calcular métricas de saliência no recorte da boca
-        mean_saliency = np.mean(mouth_saliency_map)
-        max_saliency = np.max(mouth_saliency_map)
-        saliency_ratio = mean_saliency / 255.0
+        # Computar 3D Saliency apenas no recorte da boca, a cada SALIENCY_EVERY frames
+        # (o buffer recebe todos os recortes, então as diferenças temporais continuam atuais)
+        self._frame_idx += 1
+        if self._cached_saliency is None or self._frame_idx % SALIENCY_EVERY == 0:
+            mouth_saliency_map = self.compute_mouth_crop_saliency(mouth_crop_resized)
+            
+            if mouth_saliency_map is None:
+                return False, frame
+            
+            # Calcular métricas de saliência no recorte da boca (reduções do OpenCV)
+            mean_saliency = cv2.mean(mouth_saliency_map)[0]
+            max_saliency = int(cv2.minMaxLoc(mouth_saliency_map)[1])
+            saliency_ratio = mean_saliency * (1.0 / 255.0)
+            self._cached_saliency = (mouth_saliency_map, saliency_ratio, max_saliency)
+        else:
+            mouth_saliency_map, saliency_ratio, max_saliency = self._cached_saliency
         
         # Critério: boca aberta se saliência média no recorte for alta
         mouth_open = saliency_ratio > MOUTH_OPEN_SALIENCY_MIN
         
         if debug:
-            debug_frame = frame.copy()
+            # As anotações são feitas no próprio frame: copiar antes apenas o recorte (pequeno)
+            clean_lip_crop = clean_lip_crop.copy()
+            debug_frame = frame
             
             # Desenhar bounding box da boca
             x1, y1, x2, y2 = bbox
@@ -168,7 +204,7 @@ class SaliencyMouthDetector:
                        (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
             
             # Criar visualização do mapa de saliência do recorte da boca
-            mouth_saliency_colored = cv2.applyColorMap(mouth_saliency_map, cv2.COLORMAP_HOT)
+            mouth_saliency_colored = cv2.applyColorMap(mouth_saliency_map, HOT_LUT)
             
             # Preparar dados para janela separada da boca (usando recorte limpo)
             mouth_data = {
@@ -188,54 +224,54 @@ def create_mouth_visualization(mouth_data):
     """
     Cria uma visualização detalhada da região da boca com saliência.
     
+    O canvas é reutilizado entre chamadas: as imagens são redimensionadas
+    direto nas suas posições e apenas a área de texto é limpa a cada frame.
+    
     Args:
         mouth_data: Dicionário com dados da boca (lip_crop, saliency_map, etc.)
         
     Returns:
-        Imagem combinada para exibição na janela separada
+        Imagem combinada para exibição na janela separada (válida até a próxima chamada)
     """
+    global _mouth_viz_canvas
+    
     # Extrair dados
     lip_crop = mouth_data['lip_crop']
-    mouth_saliency_map = mouth_data['mouth_saliency_map']
     mouth_saliency_colored = mouth_data['mouth_saliency_colored']
     mouth_open = mouth_data['mouth_open']
     saliency_ratio = mouth_data['saliency_ratio']
     max_saliency = mouth_data['max_saliency']
     
     # Tamanho da visualização (maior para melhor qualidade)
-    display_width = 400
-    display_height = 300
-    
-    # Redimensionar recorte da boca
-    lip_crop_resized = cv2.resize(lip_crop, (display_width//2, display_height//2))
-    
-    # Redimensionar mapa de saliência
-    saliency_resized = cv2.resize(mouth_saliency_colored, (display_width//2, display_height//2))
-    
-    # Criar canvas para a visualização
-    visualization = np.zeros((display_height, display_width, 3), dtype=np.uint8)
-    
-    # Posicionar recorte da boca (lado esquerdo)
-    h_crop, w_crop = lip_crop_resized.shape[:2]
+    display_height, display_width = MOUTH_VIZ_SIZE
+    half_width = display_width // 2
+    h_cell = display_height // 2
     y_offset = 20
-    visualization[y_offset:y_offset+h_crop, 0:w_crop] = lip_crop_resized
     
-    # Posicionar mapa de saliência (lado direito)
-    h_sal, w_sal = saliency_resized.shape[:2]
-    visualization[y_offset:y_offset+h_sal, display_width//2:display_width//2+w_sal] = saliency_resized
+    if _mouth_viz_canvas is None:
+        # Criar canvas com os textos fixos apenas uma vez
+        _mouth_viz_canvas = np.zeros((display_height, display_width, 3), dtype=np.uint8)
+        cv2.putText(_mouth_viz_canvas, "Original", (10, 15), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        cv2.putText(_mouth_viz_canvas, "3D Saliency", (half_width + 10, 15), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    visualization = _mouth_viz_canvas
+    
+    # Redimensionar recorte da boca (lado esquerdo) e mapa de saliência (lado direito)
+    # direto nas suas posições do canvas
+    cv2.resize(lip_crop, (half_width, h_cell), dst=visualization[y_offset:y_offset+h_cell, 0:half_width])
+    cv2.resize(mouth_saliency_colored, (half_width, h_cell),
+               dst=visualization[y_offset:y_offset+h_cell, half_width:display_width])
     
-    # Adicionar labels
-    cv2.putText(visualization, "Original", (10, 15), 
-               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-    cv2.putText(visualization, "3D Saliency", (display_width//2 + 10, 15), 
-               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    # Limpar apenas a área de informações
+    visualization[y_offset+h_cell:] = 0
     
     # Status da boca
     status_text = "BOCA ABERTA" if mouth_open else "BOCA FECHADA"
     status_color = (0, 255, 0) if mouth_open else (0, 0, 255)
     
     # Informações na parte inferior
-    info_y_start = y_offset + max(h_crop, h_sal) + 30
+    info_y_start = y_offset + h_cell + 30
     cv2.putText(visualization, status_text, (10, info_y_start), 
                cv2.FONT_HERSHEY_SIMPLEX, 0.8, status_color, 2)
     
@@ -249,7 +285,7 @@ def create_mouth_visualization(mouth_data):
                (10, info_y_start + 65), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
     
     # Linha divisória
-    cv2.line(visualization, (display_width//2, 0), (display_width//2, display_height), (128, 128, 128), 1)
+    cv2.line(visualization, (half_width, 0), (half_width, display_height), (128, 128, 128), 1)
     
     return visualization
 
@@ -257,12 +293,17 @@ def create_advanced_mouth_visualization(mouth_data):
     """
     Cria uma visualização avançada com múltiplos tipos de análise da boca.
     
+    O canvas é reutilizado entre chamadas: cada célula é escrita direto na sua
+    posição (resize/applyColorMap com dst) e apenas a área de texto é limpa.
+    
     Args:
         mouth_data: Dicionário com dados da boca
         
     Returns:
-        Imagem com grid de diferentes visualizações
+        Imagem com grid de diferentes visualizações (válida até a próxima chamada)
     """
+    global _advanced_viz_canvas
+    
     # Extrair dados
     lip_crop = mouth_data['lip_crop']
     mouth_saliency_map = mouth_data['mouth_saliency_map']
@@ -279,52 +320,42 @@ def create_advanced_mouth_visualization(mouth_data):
     # Canvas total
     total_width = grid_cols * cell_width
     total_height = grid_rows * cell_height + 80  # Espaço extra para texto
-    canvas = np.zeros((total_height, total_width, 3), dtype=np.uint8)
+    if _advanced_viz_canvas is None:
+        _advanced_viz_canvas = np.zeros((total_height, total_width, 3), dtype=np.uint8)
+    canvas = _advanced_viz_canvas
     
-    # Redimensionar recorte da boca para as células
-    lip_resized = cv2.resize(lip_crop, (cell_width, cell_height))
-    saliency_resized = cv2.resize(mouth_saliency_map, (cell_width, cell_height))
+    def cell(row, col):
+        return canvas[row*cell_height:(row+1)*cell_height, col*cell_width:(col+1)*cell_width]
     
-    # 1. Original (canto superior esquerdo)
-    canvas[0:cell_height, 0:cell_width] = lip_resized
-    cv2.putText(canvas, "Original", (5, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-    
-    # 2. Saliência Hot (canto superior centro)
-    saliency_hot = cv2.applyColorMap(saliency_resized, cv2.COLORMAP_HOT)
-    canvas[0:cell_height, cell_width:2*cell_width] = saliency_hot
-    cv2.putText(canvas, "Hot Saliency", (cell_width+5, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-    
-    # 3. Saliência Jet (canto superior direito)
-    saliency_jet = cv2.applyColorMap(saliency_resized, cv2.COLORMAP_JET)
-    canvas[0:cell_height, 2*cell_width:3*cell_width] = saliency_jet
-    cv2.putText(canvas, "Jet Saliency", (2*cell_width+5, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    # 1. Original (canto superior esquerdo): recorte redimensionado direto na célula
+    lip_resized = cv2.resize(lip_crop, (cell_width, cell_height), dst=cell(0, 0))
+    saliency_resized = cv2.resize(mouth_saliency_map, (cell_width, cell_height))
     
-    # 4. Saliência Viridis (canto inferior esquerdo)
-    saliency_viridis = cv2.applyColorMap(saliency_resized, cv2.COLORMAP_VIRIDIS)
-    canvas[cell_height:2*cell_height, 0:cell_width] = saliency_viridis
-    cv2.putText(canvas, "Viridis Saliency", (5, cell_height+20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    # 2-4. Saliência Hot, Jet e Viridis
+    cv2.applyColorMap(saliency_resized, HOT_LUT, dst=cell(0, 1))
+    cv2.applyColorMap(saliency_resized, JET_LUT, dst=cell(0, 2))
+    cv2.applyColorMap(saliency_resized, VIRIDIS_LUT, dst=cell(1, 0))
     
     # 5. Análise de bordas (canto inferior centro)
     gray_lip = cv2.cvtColor(lip_resized, cv2.COLOR_BGR2GRAY)
     edges = cv2.Canny(gray_lip, 50, 150)
-    edges_colored = cv2.applyColorMap(edges, cv2.COLORMAP_COOL)
-    canvas[cell_height:2*cell_height, cell_width:2*cell_width] = edges_colored
-    cv2.putText(canvas, "Edge Analysis", (cell_width+5, cell_height+20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    cv2.applyColorMap(edges, COOL_LUT, dst=cell(1, 1))
     
-    # 6. Combinação Original + Saliência (canto inferior direito)
-    # Converter original para float e normalizar
-    lip_float = lip_resized.astype(np.float32) / 255.0
-    saliency_float = saliency_resized.astype(np.float32) / 255.0
-    
-    # Criar overlay com transparência
+    # 6. Combinação Original + Saliência com transparência (canto inferior direito)
     alpha = 0.6
-    combined = lip_float * alpha + cv2.applyColorMap(saliency_resized, cv2.COLORMAP_RAINBOW).astype(np.float32) / 255.0 * (1 - alpha)
-    combined = (combined * 255).astype(np.uint8)
+    saliency_rainbow = cv2.applyColorMap(saliency_resized, RAINBOW_LUT)
+    cv2.addWeighted(lip_resized, alpha, saliency_rainbow, 1 - alpha, 0, dst=cell(1, 2))
     
-    canvas[cell_height:2*cell_height, 2*cell_width:3*cell_width] = combined
+    # Rótulos (desenhados depois de todas as células, pois o Original é usado no Overlay)
+    cv2.putText(canvas, "Original", (5, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    cv2.putText(canvas, "Hot Saliency", (cell_width+5, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    cv2.putText(canvas, "Jet Saliency", (2*cell_width+5, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    cv2.putText(canvas, "Viridis Saliency", (5, cell_height+20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    cv2.putText(canvas, "Edge Analysis", (cell_width+5, cell_height+20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
     cv2.putText(canvas, "Overlay", (2*cell_width+5, cell_height+20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
     
-    # Área de informações na parte inferior
+    # Área de informações na parte inferior (única parte limpa a cada frame)
+    canvas[2*cell_height:] = 0
     info_y = 2 * cell_height + 10
     
     # Status da boca com fundo colorido
@@ -397,17 +428,24 @@ def test_3d_saliency_mouth_detection():
     
     print("✅ Câmera aberta com sucesso")
     
+    # Tornar as janelas redimensionáveis (criadas uma única vez, antes do loop)
+    cv2.namedWindow('3D Saliency Mouth Detection', cv2.WINDOW_NORMAL)
+    cv2.namedWindow('Mouth Region Analysis', cv2.WINDOW_NORMAL)
+    cv2.namedWindow('Advanced Mouth Analysis', cv2.WINDOW_NORMAL)
+    
     global MOUTH_OPEN_SALIENCY_MIN, TEMPORAL_SALIENCY_WEIGHT, STATIC_SALIENCY_WEIGHT, SALIENCY_AMPLIFICATION, GAUSSIAN_BLUR_SIZE
+    # Leitura da câmera em uma thread separada, sobreposta à detecção
+    reader = FrameReader(cap)
     frame_count = 0
     
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        frame = reader.read()
+        if frame is None:
             print("❌ Erro: Não foi possível ler o frame da câmera")
             break
         
         frame_count += 1
-        frame = cv2.flip(frame, 1)  # Espelhar horizontalmente
+        cv2.flip(frame, 1, dst=frame)  # Espelhar horizontalmente (in-place, sem novo buffer)
         
         # Detectar se a boca está aberta usando 3D Saliency
         result = detector.is_mouth_open_saliency(frame, debug=True)
@@ -450,16 +488,12 @@ def test_3d_saliency_mouth_detection():
         
         cv2.imshow('3D Saliency Mouth Detection', debug_frame)
         
-        # Tornar as janelas redimensionáveis
-        cv2.namedWindow('Mouth Region Analysis', cv2.WINDOW_NORMAL)
-        cv2.namedWindow('Advanced Mouth Analysis', cv2.WINDOW_NORMAL)
-        
         # Processar teclas
         key = cv2.waitKey(1) & 0xFF
         if key == ord('q'):
             break
         elif key == ord('r'):
-            detector.frame_buffer = []
+            detector.reset_buffer()
             print("🔄 Buffer de frames resetado")
         
         # Controles de threshold de detecção
@@ -506,6 +540,7 @@ def test_3d_saliency_mouth_detection():
             GAUSSIAN_BLUR_SIZE = min(21, GAUSSIAN_BLUR_SIZE + 2)
             print(f"🌫️  Blur gaussiano: {int(GAUSSIAN_BLUR_SIZE)}")
     
+    reader.stop()
     cap.release()
     cv2.destroyAllWindows()
     print("\n=== TESTE FINALIZADO ===")
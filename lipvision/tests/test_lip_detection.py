@@ -7,6 +7,7 @@ tanto o lábio superior quanto o inferior corretamente.
 import cv2
 import numpy as np
 from lipvision.data_collection.lip_detector import LipDetector
+from lipvision.data_collection.camera import FrameReader
 
 def test_lip_detection():
     """Testa a detecção de lábios com uma imagem de exemplo ou câmera"""
@@ -26,16 +27,18 @@ def test_lip_detection():
     print("✅ Câmera aberta com sucesso")
     print("Pressione 'q' para sair, 'space' para analisar frame atual")
     
+    # Leitura da câmera em uma thread separada, sobreposta à detecção
+    reader = FrameReader(cap)
     frame_count = 0
     
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        frame = reader.read()
+        if frame is None:
             print("❌ Erro: Não foi possível ler o frame da câmera")
             break
         
         frame_count += 1
-        frame = cv2.flip(frame, 1)  # Espelhar horizontalmente
+        cv2.flip(frame, 1, dst=frame)  # Espelhar horizontalmente (in-place, sem novo buffer)
         
         # Processar frame
         processed_frame, lip_crop, bbox = detector.process_frame(frame)
@@ -44,12 +47,9 @@ def test_lip_detection():
         if frame_count % 30 == 0:
             print(f"\n--- Frame {frame_count} ---")
             
-            # Obter dados dos lábios
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = detector.face_mesh.process(rgb_frame)
-            
-            if results.multi_face_landmarks:
-                for face_landmarks in results.multi_face_landmarks:
+            # Obter dados dos lábios (landmarks do próprio process_frame, sem rodar o Face Mesh de novo)
+            if detector.last_landmarks:
+                for face_landmarks in detector.last_landmarks:
                     h, w, _ = frame.shape
                     upper_lip, lower_lip = detector.get_lip_regions_separately(face_landmarks.landmark, h, w)
                     validation = detector.validate_lip_detection(upper_lip, lower_lip)
@@ -84,11 +84,9 @@ def test_lip_detection():
         elif key == ord(' '):
             # Análise detalhada do frame atual
             print("\n=== ANÁLISE DETALHADA ===")
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = detector.face_mesh.process(rgb_frame)
-            
-            if results.multi_face_landmarks:
-                for i, face_landmarks in enumerate(results.multi_face_landmarks):
+            # Landmarks do próprio process_frame (sem rodar o Face Mesh de novo)
+            if detector.last_landmarks:
+                for i, face_landmarks in enumerate(detector.last_landmarks):
                     print(f"Face {i+1}:")
                     h, w, _ = frame.shape
                     
@@ -105,6 +103,7 @@ def test_lip_detection():
                     validation = detector.validate_lip_detection(upper_lip, lower_lip)
                     print(f"  Status: {'✅ OK' if validation['both_lips_detected'] else '❌ PROBLEMA'}")
     
+    reader.stop()
     cap.release()
     cv2.destroyAllWindows()
     print("\n=== TESTE FINALIZADO ===")
@@ -12,10 +12,12 @@ Uso:
 
 import argparse
 import sys
-import cv2
 
 def check_camera():
     """Verifica se a câmera está disponível"""
+    # Importado apenas aqui: --help e erros de argumentos não carregam o OpenCV
+    import cv2
+    
     cap = cv2.VideoCapture(0)
     if not cap.isOpened():
         print("❌ Erro: Câmera não encontrada ou não acessível")